@@ -0,0 +1,53 @@
+"""Benchmark JSON encoding of large query results.
+
+Compares pydantic `model_dump_json` of a fully built `QueryResult` with encoding
+of the same data straight from rows, with `orjson` and with the standard library.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from ecst import encoders
+from ecst.encoders import QUERY_COLUMNS, dump_rows
+from ecst.schemas import QueryResult, QueryResultData
+
+DATE_START = datetime(2023, 1, 1)
+
+
+def main(args: argparse.Namespace):
+    rows = [
+        (f"T{number % 500}", DATE_START + timedelta(minutes=number), number / 7, None)
+        for number in range(args.rows)
+    ]
+    orjson = encoders.orjson
+
+    def pydantic():
+        data = [QueryResultData(**dict(zip(QUERY_COLUMNS, row))) for row in rows]
+        return QueryResult(data=data).model_dump_json()
+
+    def stdlib():
+        encoders.orjson = None
+        try:
+            return dump_rows(QUERY_COLUMNS, rows)
+        finally:
+            encoders.orjson = orjson
+
+    calls = {
+        "pydantic": pydantic,
+        "rows (stdlib)": stdlib,
+        "rows (orjson)": lambda: dump_rows(QUERY_COLUMNS, rows),
+        "rows (jsonl)": lambda: dump_rows(QUERY_COLUMNS, rows, lines=True),
+    }
+    print(f"{'Encoder':<16}\tRows per second")
+    for name, call in calls.items():
+        if "orjson" in name and orjson is None:
+            continue
+        started = time.perf_counter()
+        call()
+        print(f"{name:<16}\t{args.rows / (time.perf_counter() - started):.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", help="Number of rows to encode", type=int, default=200000)
+    main(parser.parse_args())
@@ -0,0 +1,61 @@
+"""Benchmark per-call Python overhead of hot `Storage` methods.
+
+Calls are made sequentially against a tiny in-memory database, so the time is
+dominated by building, compiling and executing statements rather than by the database.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from ecst.models import Indicator, IndicatorData
+from ecst.storages import Storage
+
+DATE_START = datetime(2023, 1, 1)
+
+
+async def main(args: argparse.Namespace):
+    storage = Storage("sqlite+aiosqlite:///:memory:")
+    await storage.connect()
+    async with storage.session() as session:
+        async with session.begin():
+            session.add(
+                Indicator(
+                    ticker="USBENCH",
+                    country="US",
+                    currency="USD",
+                    indicator="USBENCH",
+                    title="USBENCH",
+                    data=[IndicatorData(ticker="USBENCH", date=DATE_START, actual=1.0)],
+                )
+            )
+
+    calls = {
+        "query": lambda tickers: storage.query(
+            DATE_START,
+            DATE_START + timedelta(days=1),
+            countries=["US"],
+            tickers=tickers,
+            no_sync=True,
+        ),
+        "list": lambda tickers: storage.list(countries=["US"]),
+        "latest": lambda tickers: storage.latest(countries=["US"], tickers=tickers),
+        "dates_to_sync": lambda tickers: storage.dates_to_sync(
+            DATE_START, DATE_START + timedelta(days=1), countries=["US"]
+        ),
+    }
+    print(f"{'Method':<16}\tMicroseconds per call")
+    for name, call in calls.items():
+        # vary number of tickers, as it used to change compiled cache keys
+        for number in range(args.calls // 10):
+            await call(["USBENCH"] * (number % 10 + 1))
+        started = time.perf_counter()
+        for number in range(args.calls):
+            await call(["USBENCH"] * (number % 10 + 1))
+        print(f"{name:<16}\t{(time.perf_counter() - started) / args.calls * 1e6:.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", help="Number of calls per method", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
@@ -5,7 +5,9 @@ import sys
 from pydantic import ValidationError
 
 from . import __version__
-from .commands import list_indicators, query_indicators
+from .commands import (backfill_indicators, compact_indicators, latest_indicators,
+                       list_indicators, load_test_storage, mock_provider, query_indicators,
+                       serve_indicators, watch_indicators)
 from .schemas import Settings
 
 
@@ -19,13 +21,94 @@ def main():
         "--storage",
         help="Database connection string. Support environment variable `ECST_STORAGE`",
     )
+    parser.add_argument(
+        "--replicas",
+        help="Comma separated connection strings of read replicas. "
+        "Support environment variable `ECST_REPLICAS`",
+    )
+    parser.add_argument(
+        "--shards",
+        help="Comma separated connection strings of databases to keep particular countries in "
+        "(ex US=sqlite+aiosqlite:///us.db). Support environment variable `ECST_SHARDS`",
+    )
     parser.add_argument(
         "--version",
         help="Print version information and quite",
         action="version",
         version=__version__,
     )
-    parser.add_argument("--format", help="Output format (csv, json, text)")
+    parser.add_argument(
+        "--cache",
+        help="Path to file caching results between runs, until storage is updated. "
+        "Support environment variable `ECST_CACHE`",
+    )
+    parser.add_argument(
+        "--cache-size",
+        help="Maximum size of cache file in bytes. Support environment variable `ECST_CACHE_SIZE`",
+        type=int,
+    )
+    parser.add_argument(
+        "--provider-url",
+        help="Base URL of provider API, ex. of a mock server. "
+        "Support environment variable `ECST_PROVIDER_URL`",
+    )
+    parser.add_argument("--format", help="Output format (csv, json, jsonl, text)")
+    parser.add_argument(
+        "--executor",
+        help="Run CPU bound work in executor (none, thread, process). "
+        "Support environment variable `ECST_EXECUTOR`",
+    )
+    parser.add_argument(
+        "--executor-workers", help="Maximum number of executor workers", type=int
+    )
+    parser.add_argument(
+        "--batch-size", help="Number of items passed to executor at once", type=int
+    )
+    parser.add_argument(
+        "--queue-size",
+        help="Number of chunks waiting between fetch, transform and write stages of sync",
+        type=int,
+    )
+    parser.add_argument(
+        "--pool-size",
+        help="Number of connections kept in pool. Support environment variable `ECST_POOL_SIZE`",
+        type=int,
+    )
+    parser.add_argument(
+        "--max-overflow",
+        help="Number of connections allowed above pool size. "
+        "Support environment variable `ECST_MAX_OVERFLOW`",
+        type=int,
+    )
+    parser.add_argument(
+        "--pool-timeout",
+        help="Seconds to wait for a connection from pool. "
+        "Support environment variable `ECST_POOL_TIMEOUT`",
+        type=float,
+    )
+    parser.add_argument(
+        "--pool-recycle",
+        help="Seconds after which connections are recreated. "
+        "Support environment variable `ECST_POOL_RECYCLE`",
+        type=int,
+    )
+    parser.add_argument(
+        "--pool-pre-ping",
+        help="Test connections before use. Support environment variable `ECST_POOL_PRE_PING`",
+        action=argparse.BooleanOptionalAction,
+    )
+    parser.add_argument(
+        "--query-cache-size",
+        help="Size of SQLAlchemy compiled query cache. "
+        "Support environment variable `ECST_QUERY_CACHE_SIZE`",
+        type=int,
+    )
+    parser.add_argument(
+        "--statement-cache-size",
+        help="Size of database driver prepared statement cache. "
+        "Support environment variable `ECST_STATEMENT_CACHE_SIZE`",
+        type=int,
+    )
 
     # Commands
     commands = parser.add_subparsers(title="Commands", dest="command")
@@ -60,6 +143,12 @@ def main():
     query_parser.add_argument(
         "--countries", help="Fetch data related to particular countries", type=str
     )
+    query_parser.add_argument(
+        "--limit", help="Maximum number of data points to return at once", type=int
+    )
+    query_parser.add_argument(
+        "--cursor", help="Continue from the page where the previous query stopped"
+    )
 
     query_parser.set_defaults(func=query_indicators)
 
@@ -71,6 +160,161 @@ def main():
     list_parser.add_argument(
         "--countries", help="Fetch data related to particular countries", type=str
     )
+    list_parser.add_argument(
+        "--search", help="Find indicators by words in ticker, title or indicator name"
+    )
+
+    # Latest command
+    latest_parser = commands.add_parser(
+        "latest",
+        help="Show the most recent value of indicators",
+        argument_default=argparse.SUPPRESS,
+    )
+    latest_parser.set_defaults(func=latest_indicators)
+    latest_parser.add_argument(
+        "--tickers", help="List of indicators to include into result", nargs="+"
+    )
+    latest_parser.add_argument(
+        "--countries", help="Fetch data related to particular countries", type=str
+    )
+
+    # Backfill command
+    backfill_parser = commands.add_parser(
+        "backfill",
+        help="Load history of indicators for specified date range",
+        argument_default=argparse.SUPPRESS,
+    )
+    backfill_parser.set_defaults(func=backfill_indicators)
+    backfill_parser.add_argument(
+        "--from",
+        "--date-start",
+        dest="date_start",
+        help="Load data starting from this date (2023-01-19, 2023-01-19T10:30:00)",
+    )
+    backfill_parser.add_argument(
+        "--to",
+        "--date-end",
+        dest="date_end",
+        help="Load data till provided date (ex 2023-01-19, 2023-01-19T10:30:00)",
+    )
+    backfill_parser.add_argument(
+        "--countries", help="Load data related to particular countries", type=str
+    )
+    backfill_parser.add_argument(
+        "--chunk-days", help="Number of days to fetch from provider at once", type=int
+    )
+    backfill_parser.add_argument(
+        "--resume",
+        help="Continue the last interrupted backfill, loading only unfinished chunks",
+        action="store_true",
+    )
+
+    # Compact command
+    compact_parser = commands.add_parser(
+        "compact",
+        help="Remove data older than retention period",
+        argument_default=argparse.SUPPRESS,
+    )
+    compact_parser.set_defaults(func=compact_indicators)
+    compact_parser.add_argument(
+        "--retention-days", help="Number of days to keep data for", type=int
+    )
+    compact_parser.add_argument(
+        "--retention",
+        help="Number of days to keep data for particular countries or tickers (ex US=365,AUCIR=30)",
+        type=str,
+    )
+    compact_parser.add_argument(
+        "--archive", help="Append removed data to gzip compressed JSON Lines file"
+    )
+    compact_parser.add_argument(
+        "--no-vacuum",
+        help="Don't reclaim disk space after removing data",
+        action="store_true",
+    )
+
+    # Watch command
+    watch_parser = commands.add_parser(
+        "watch",
+        help="Print indicator data as soon as it is released",
+        argument_default=argparse.SUPPRESS,
+    )
+    watch_parser.set_defaults(func=watch_indicators)
+    watch_parser.add_argument(
+        "--tickers", help="List of indicators to include into result", nargs="+"
+    )
+    watch_parser.add_argument(
+        "--countries", help="Fetch data related to particular countries", type=str
+    )
+    watch_parser.add_argument(
+        "--interval", help="Number of seconds between syncs around releases", type=int
+    )
+    watch_parser.add_argument(
+        "--max-interval", help="Maximum number of seconds between syncs", type=int
+    )
+
+    # Serve command
+    serve_parser = commands.add_parser(
+        "serve",
+        help="Serve indicators over HTTP",
+        argument_default=argparse.SUPPRESS,
+    )
+    serve_parser.set_defaults(func=serve_indicators)
+    serve_parser.add_argument("--host", help="Interface to listen on")
+    serve_parser.add_argument("--port", help="Port to listen on", type=int)
+    serve_parser.add_argument(
+        "--workers", help="Number of worker processes serving requests", type=int
+    )
+    serve_parser.add_argument(
+        "--interval", help="Number of seconds between syncs around releases", type=int
+    )
+    serve_parser.add_argument(
+        "--max-interval", help="Maximum number of seconds between syncs", type=int
+    )
+
+    # Mock provider command
+    mock_parser = commands.add_parser(
+        "mock",
+        help="Serve synthetic events in the format of provider API",
+        argument_default=argparse.SUPPRESS,
+    )
+    mock_parser.set_defaults(func=mock_provider)
+    mock_parser.add_argument("--host", help="Interface to listen on")
+    mock_parser.add_argument("--port", help="Port to listen on", type=int)
+    mock_parser.add_argument(
+        "--latency", help="Number of seconds to wait before responding", type=float
+    )
+    mock_parser.add_argument("--size", help="Number of events in every response", type=int)
+    mock_parser.add_argument(
+        "--error-rate", help="Share of requests to fail with server error (0-1)", type=float
+    )
+
+    # Load test command
+    loadtest_parser = commands.add_parser(
+        "loadtest",
+        help="Run concurrent workloads and report throughput and latency percentiles",
+        argument_default=argparse.SUPPRESS,
+    )
+    loadtest_parser.set_defaults(func=load_test_storage)
+    loadtest_parser.add_argument(
+        "--workloads", help="Workloads to run one by one (query, sync, latest)", nargs="+"
+    )
+    loadtest_parser.add_argument(
+        "--concurrency", help="Number of requests made at the same time", type=int
+    )
+    loadtest_parser.add_argument(
+        "--requests", help="Number of requests of every workload", type=int
+    )
+    loadtest_parser.add_argument(
+        "--window-days", help="Number of days requested at once", type=int
+    )
+    loadtest_parser.add_argument(
+        "--date-start", help="Request windows starting from this date (2023-01-19)"
+    )
+    loadtest_parser.add_argument("--date-end", help="Request windows till this date (2023-01-19)")
+    loadtest_parser.add_argument(
+        "--days", help="Calculate date range based on number of days", type=int
+    )
 
     try:
         args = parser.parse_args()
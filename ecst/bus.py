@@ -0,0 +1,28 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Set
+
+from .schemas import DataChange
+
+
+class EventBus:
+    """In-process publish/subscribe bus to notify about changes in storage."""
+
+    def __init__(self):
+        self.subscribers: Set[asyncio.Queue] = set()
+
+    def publish(self, changes: List[DataChange]):
+        """Deliver changes to every subscriber."""
+        for queue in self.subscribers:
+            for change in changes:
+                queue.put_nowait(change)
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[asyncio.Queue]:
+        """Subscribe to changes for the lifetime of the context."""
+        queue = asyncio.Queue()
+        self.subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self.subscribers.discard(queue)
@@ -0,0 +1,125 @@
+"""Two-tier cache of storage results shared between processes.
+
+The first tier keeps results in memory of the current process, and the second one
+keeps them in a local SQLite file, so short-lived CLI processes can reuse results of
+each other. Every result is cached for a generation of storage data, and any storage
+update bumps the generation, invalidating all results cached before it.
+"""
+import pickle
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class ResultCache:
+    def __init__(self, path: str, max_size: int = 64 * 2**20, memory_size: int = 256):
+        """
+        Open cache file, creating it if needed.
+
+        Parameters
+        ----------
+        path : str
+            Path to cache file.
+        max_size : int, optional
+            Maximum size of cached values on disk in bytes, by default 64 MiB.
+            Least recently used values are evicted to fit it.
+        memory_size : int, optional
+            Maximum number of values kept in memory, by default 256
+        """
+        self.max_size = max_size
+        self.memory_size = memory_size
+        self.memory: OrderedDict = OrderedDict()
+        # the same file is used by several processes, which wait for each other's writes
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, "
+            "generation INTEGER, value BLOB NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS ix_cache_accessed ON cache (accessed)")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS generation (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        self.db.execute("INSERT OR IGNORE INTO generation VALUES (0, 0)")
+
+    def generation(self) -> int:
+        """Return the current generation of storage data."""
+        return self.db.execute("SELECT value FROM generation WHERE id = 0").fetchone()[0]
+
+    def bump(self):
+        """Start a new generation of storage data, invalidating all cached values."""
+        self.db.execute("UPDATE generation SET value = value + 1 WHERE id = 0")
+        self.memory.clear()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get value cached for the current generation, or None."""
+        generation = self.generation()
+        if key in self.memory and self.memory[key][0] in (generation, None):
+            self.memory.move_to_end(key)
+            return self.memory[key][1]
+
+        row = self.db.execute(
+            "SELECT generation, value FROM cache WHERE key = ? "
+            "AND (generation = ? OR generation IS NULL)",
+            (key, generation),
+        ).fetchone()
+        if row is None:
+            return None
+        self.db.execute("UPDATE cache SET accessed = ? WHERE key = ?", (time.time(), key))
+        value = pickle.loads(row[1])
+        self.remember(key, row[0], value)
+        return value
+
+    def put(self, key: str, value: Any, generation: Optional[int] = None):
+        """
+        Cache value computed in generation of storage data.
+
+        Parameters
+        ----------
+        key : str
+            Key of value.
+        value : Any
+            Value to cache.
+        generation : Optional[int], optional
+            Generation of data the value was computed from, by default None
+            (value doesn't depend on storage data, and is never invalidated)
+        """
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_size:
+            return
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            current = self.generation()
+            # value computed before storage update is already outdated
+            if generation is not None and generation != current:
+                return
+            self.db.execute("DELETE FROM cache WHERE generation < ?", (current,))
+            self.db.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                (key, generation, blob, time.time()),
+            )
+            self.evict()
+        finally:
+            self.db.execute("COMMIT")
+        self.remember(key, generation, value)
+
+    def evict(self):
+        """Remove least recently used values that don't fit into maximum size."""
+        size = 0
+        rows = self.db.execute("SELECT key, length(value) FROM cache ORDER BY accessed DESC")
+        evicted = []
+        for key, length in rows:
+            size += length
+            if size > self.max_size:
+                evicted.append((key,))
+        self.db.executemany("DELETE FROM cache WHERE key = ?", evicted)
+        for (key,) in evicted:
+            self.memory.pop(key, None)
+
+    def remember(self, key: str, generation: Optional[int], value: Any):
+        """Keep value in memory, forgetting the least recently used one if there are too many."""
+        self.memory[key] = (generation, value)
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
@@ -1,31 +1,67 @@
+import asyncio
 import sys
+from concurrent.futures import Executor
+from functools import partial
+from typing import Optional
 
-from .schemas import Settings
+from .encoders import QUERY_COLUMNS, dump_result, dump_rows
+from .enums import OutputFormat
+from .executors import run
+from .loadtest import load_test
+from .logger import log
+from .mock import serve_mock
+from .schemas import QueryResult, Settings
+from .server import serve
 from .storages import Storage
 
 
-def format(data, dump_as: str = "text"):
+def write(body: bytes):
+    """Write encoded output to stdout, keeping its order with printed text."""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(body)
+    sys.stdout.buffer.flush()
+
+
+async def format(data, dump_as: str = "text", executor: Optional[Executor] = None):
+    if dump_as in (OutputFormat.JSON, OutputFormat.JSONL):
+        body = await run(executor, dump_result, data, dump_as == OutputFormat.JSONL)
+        write(body if dump_as == OutputFormat.JSONL else body + b"\n")
+        return
     dump = {
         "csv": data.model_dump_csv,
-        "json": data.model_dump_json,
         "text": data.model_dump_text,
     }[dump_as]
-    print(dump())
+    print(await run(executor, dump))
 
 
 async def query_indicators(settings: Settings):
     """Query data from storage for given range of dates."""
     try:
-        storage = Storage(settings.storage)
+        storage = Storage.from_settings(settings)
         await storage.connect()
-        result = await storage.query(
+        params = dict(
             date_start=settings.date_start,
             date_end=settings.date_end,
             countries=settings.countries,
             tickers=settings.tickers,
             no_sync=settings.no_sync,
+            limit=settings.limit,
+            cursor=settings.cursor,
         )
-        format(result, settings.format)
+        if settings.format in (OutputFormat.JSON, OutputFormat.JSONL):
+            # large exports are encoded straight from rows, without building models
+            rows, cursor = await storage.query_rows(**params)
+            lines = settings.format == OutputFormat.JSONL
+            body = await run(
+                storage.executor, partial(dump_rows, QUERY_COLUMNS, rows, lines, cursor=cursor)
+            )
+            write(body if lines else body + b"\n")
+        else:
+            result = await storage.query(**params)
+            await format(result, settings.format, storage.executor)
+            cursor = result.cursor
+        if cursor:
+            log.info(f"There is more data, continue with --cursor {cursor}")
     except Exception as e:
         sys.exit(e)
 
@@ -33,9 +69,106 @@ async def query_indicators(settings: Settings):
 async def list_indicators(settings: Settings):
     """List available indicators."""
     try:
-        storage = Storage(settings.storage)
+        storage = Storage.from_settings(settings)
+        await storage.connect()
+        result = await storage.list(settings.countries, settings.search)
+        await format(result, settings.format, storage.executor)
+    except Exception as e:
+        sys.exit(e)
+
+
+async def latest_indicators(settings: Settings):
+    """Show the most recent value of indicators."""
+    try:
+        storage = Storage.from_settings(settings)
+        await storage.connect()
+        result = await storage.latest(countries=settings.countries, tickers=settings.tickers)
+        await format(result, settings.format, storage.executor)
+    except Exception as e:
+        sys.exit(e)
+
+
+async def backfill_indicators(settings: Settings):
+    """Load history of indicators for given range of dates."""
+    try:
+        storage = Storage.from_settings(settings)
         await storage.connect()
-        result = await storage.list(settings.countries)
-        format(result, settings.format)
+        tickers = await storage.backfill(
+            date_start=settings.date_start,
+            date_end=settings.date_end,
+            countries=settings.countries,
+            chunk_days=settings.chunk_days,
+            resume=settings.resume,
+        )
+        log.info(f"Backfill completed, {len(tickers)} indicators updated")
+    except Exception as e:
+        sys.exit(e)
+
+
+async def compact_indicators(settings: Settings):
+    """Remove data older than retention period."""
+    try:
+        storage = Storage.from_settings(settings)
+        await storage.connect()
+        await storage.compact(
+            retention=settings.retention,
+            retention_days=settings.retention_days,
+            archive=settings.archive,
+            vacuum=not settings.no_vacuum,
+        )
+    except Exception as e:
+        sys.exit(e)
+
+
+async def watch_indicators(settings: Settings):
+    """Print indicator data as soon as it is released."""
+    try:
+        storage = Storage.from_settings(settings)
+        await storage.connect()
+        poller = asyncio.create_task(
+            storage.poll(settings.countries, settings.interval, settings.max_interval)
+        )
+        try:
+            async for changes in storage.watch(
+                countries=settings.countries, tickers=settings.tickers
+            ):
+                await format(QueryResult(data=changes), settings.format, storage.executor)
+        finally:
+            poller.cancel()
+    except Exception as e:
+        sys.exit(e)
+
+
+async def serve_indicators(settings: Settings):
+    """Serve indicators over HTTP."""
+    try:
+        await serve(settings)
+    except Exception as e:
+        sys.exit(e)
+
+
+async def mock_provider(settings: Settings):
+    """Serve synthetic events in the format of provider API."""
+    try:
+        await serve_mock(settings)
+    except Exception as e:
+        sys.exit(e)
+
+
+async def load_test_storage(settings: Settings):
+    """Run concurrent workloads against storage and report throughput and latency."""
+    try:
+        storage = Storage.from_settings(settings)
+        await storage.connect()
+        result = await load_test(
+            storage,
+            workloads=settings.workloads,
+            date_start=settings.date_start,
+            date_end=settings.date_end,
+            window_days=settings.window_days,
+            concurrency=settings.concurrency,
+            requests=settings.requests,
+        )
+        await format(result, settings.format, storage.executor)
     except Exception as e:
         sys.exit(e)
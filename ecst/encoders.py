@@ -0,0 +1,70 @@
+"""Fast JSON encoding of results.
+
+Encoding is backed by `orjson` when it is installed, and falls back to the standard
+library otherwise. Both produce the same compact output as pydantic `model_dump_json`.
+"""
+import json
+from datetime import datetime
+from typing import Any, Iterable, Sequence
+
+from pydantic import BaseModel
+
+from .schemas import QueryResultData
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# order of values in rows returned by `Storage.query_rows`
+QUERY_COLUMNS = tuple(QueryResultData.model_fields)
+
+
+def default(value: Any) -> Any:
+    """Encode values that are not supported by standard library encoder."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    """Encode value to compact JSON."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, default=default, separators=(",", ":")).encode()
+
+
+def dump_rows(
+    columns: Sequence[str], rows: Iterable[Sequence], lines: bool = False, **fields
+) -> bytes:
+    """
+    Encode rows to JSON without building result models.
+
+    Parameters
+    ----------
+    columns : Sequence[str]
+        Names of values in every row.
+    rows : Iterable[Sequence]
+        Rows to encode.
+    lines : bool, optional
+        Encode every row as a separate JSON Lines object, by default False
+        (single document with rows in `data`)
+    fields : dict
+        Other fields of JSON document, ignored for JSON Lines.
+
+    Returns
+    -------
+    bytes : Encoded rows.
+    """
+    if lines:
+        return b"".join(dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+    return dumps({"data": [dict(zip(columns, row)) for row in rows], **fields})
+
+
+def dump_result(result: BaseModel, lines: bool = False) -> bytes:
+    """Encode query or list result, reading values of its rows without validation."""
+    fields = {name: getattr(result, name) for name in type(result).model_fields if name != "data"}
+    rows = [row.__dict__ for row in result.data]
+    if lines:
+        return b"".join(dumps(row) + b"\n" for row in rows)
+    return dumps({"data": rows, **fields})
@@ -54,5 +54,23 @@ class Currency(str, Enum):
 
 class OutputFormat(str, Enum):
     JSON = "json"
+    JSONL = "jsonl"
     CSV = "csv"
     TEXT = "text"
+
+
+class ExecutorType(str, Enum):
+    NONE = "none"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    DONE = "done"
+
+
+class Workload(str, Enum):
+    QUERY = "query"
+    SYNC = "sync"
+    LATEST = "latest"
@@ -0,0 +1,65 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from .enums import ExecutorType
+
+
+def create_executor(kind: ExecutorType, workers: Optional[int] = None) -> Optional[Executor]:
+    """Create executor to offload CPU bound work from event loop.
+
+    Parameters
+    ----------
+    kind : ExecutorType
+        Type of executor.
+    workers : Optional[int], optional
+        Maximum number of workers, by default None (chosen by executor)
+
+    Returns
+    -------
+    Optional[Executor] : Executor or None, if work should be done in event loop.
+    """
+    if kind == ExecutorType.THREAD:
+        return ThreadPoolExecutor(workers)
+    if kind == ExecutorType.PROCESS:
+        return ProcessPoolExecutor(workers)
+    return None
+
+
+async def run(executor: Optional[Executor], func: Callable, *args) -> Any:
+    """Run function in executor, or right away if executor is not configured."""
+    if executor is None:
+        return func(*args)
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+async def run_batches(
+    executor: Optional[Executor], func: Callable, items: List, batch_size: int
+) -> List[Any]:
+    """Run function over batches of items in executor.
+
+    Batches keep the number of tasks, and pickling overhead of process pool, small.
+
+    Parameters
+    ----------
+    executor : Optional[Executor]
+        Executor to run function in.
+    func : Callable
+        Function that accepts list of items.
+    items : List
+        Items to process.
+    batch_size : int
+        Maximum number of items passed to function at once.
+
+    Returns
+    -------
+    List[Any] : Results of function for every batch, in order.
+    """
+    if executor is None or len(items) <= batch_size:
+        return [await run(executor, func, items)]
+    return await asyncio.gather(
+        *[
+            run(executor, func, items[index : index + batch_size])  # noqa: E203
+            for index in range(0, len(items), batch_size)
+        ]
+    )
@@ -0,0 +1,117 @@
+"""Load test of storage with concurrent workloads."""
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+
+from .enums import Workload
+from .logger import log
+from .schemas import LoadTestResult, LoadTestResultData
+from .storages import Storage
+
+
+async def query(storage: Storage, date_start: datetime, date_end: datetime) -> bool:
+    """Query period, syncing its missing parts first. Return False if sync failed."""
+    synced = await storage.sync_missing(date_start, date_end)
+    await storage.query(date_start, date_end, no_sync=True)
+    return synced
+
+
+async def sync(storage: Storage, date_start: datetime, date_end: datetime) -> bool:
+    """Sync period with provider, failing if any of its chunks can't be fetched."""
+    chunks = storage.split_range(date_start, date_end, timedelta(days=storage.chunk_days))
+    await storage.pipeline(chunks, [], storage.update, strict=True)
+    return True
+
+
+async def latest(storage: Storage, date_start: datetime, date_end: datetime) -> bool:
+    """Get the most recent data points, regardless of period."""
+    await storage.latest()
+    return True
+
+
+# Requests of every workload, made for a window of dates, return False if request failed
+WORKLOADS: Dict[Workload, Callable[[Storage, datetime, datetime], Awaitable[bool]]] = {
+    Workload.QUERY: query,
+    Workload.SYNC: sync,
+    Workload.LATEST: latest,
+}
+
+
+async def load_test(
+    storage: Storage,
+    workloads: List[Workload],
+    date_start: datetime,
+    date_end: datetime,
+    window_days: int = 7,
+    concurrency: int = 10,
+    requests: int = 100,
+) -> LoadTestResult:
+    """
+    Run workloads one by one, making concurrent requests for random windows of the period.
+
+    Parameters
+    ----------
+    storage : Storage
+        Connected data storage.
+    workloads : List[Workload]
+        Workloads to run.
+    date_start : datetime
+        Start date of the period.
+    date_end : datetime
+        End date of the period.
+    window_days : int, optional
+        Number of days requested at once, by default 7
+    concurrency : int, optional
+        Number of requests made at the same time, by default 10
+    requests : int, optional
+        Number of requests of every workload, by default 100
+
+    Returns
+    -------
+    LoadTestResult : Throughput and latency percentiles of every workload.
+    """
+    window = min(timedelta(days=window_days), date_end - date_start)
+    result = LoadTestResult()
+    for workload in workloads:
+        latencies = []
+        errors = 0
+        remaining = iter(range(requests))
+
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                start = date_start + (date_end - date_start - window) * random.random()
+                started = time.perf_counter()
+                try:
+                    if not await WORKLOADS[workload](storage, start, start + window):
+                        errors += 1
+                except Exception as e:
+                    log.error(f"Request of {workload.value} workload failed: {e}")
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        seconds = time.perf_counter() - started
+        # quantiles require at least two values
+        percentiles = (
+            statistics.quantiles(latencies, n=100, method="inclusive")
+            if len(latencies) > 1
+            else latencies * 99
+        )
+        result.data.append(
+            LoadTestResultData(
+                workload=workload,
+                requests=requests,
+                errors=errors,
+                throughput=requests / seconds,
+                p50=percentiles[49],
+                p90=percentiles[89],
+                p99=percentiles[98],
+                max=max(latencies),
+            )
+        )
+    return result
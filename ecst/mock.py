@@ -0,0 +1,118 @@
+"""Local mock of provider API serving synthetic events.
+
+Responses are generated from requested period and countries, so the same
+request always returns the same events, and storage can be synced offline.
+"""
+import asyncio
+import random
+from datetime import datetime
+
+from aiohttp import web
+
+from .enums import Country, Currency
+from .logger import log
+from .schemas import Settings
+
+CURRENCIES = {
+    Country.MX: Currency.MXN,
+    Country.DE: Currency.EUR,
+    Country.FR: Currency.EUR,
+    Country.CA: Currency.CAD,
+    Country.GB: Currency.GBP,
+    Country.NZ: Currency.NZD,
+    Country.JP: Currency.JPY,
+    Country.US: Currency.USD,
+    Country.CH: Currency.CHF,
+    Country.ZA: Currency.ZAR,
+    Country.EU: Currency.EUR,
+    Country.AU: Currency.AUD,
+    Country.TR: Currency.TRY,
+    Country.ES: Currency.EUR,
+    Country.IT: Currency.EUR,
+}
+
+LATENCY = web.AppKey("latency", float)
+SIZE = web.AppKey("size", int)
+ERROR_RATE = web.AppKey("error_rate", float)
+
+
+def parse_date(value: str) -> datetime:
+    """Parse date of provider request, sent in UTC with `Z` suffix."""
+    return datetime.fromisoformat(value.removesuffix("Z"))
+
+
+def generate_events(date_start: datetime, date_end: datetime, countries: list, size: int):
+    """Generate events spread evenly over the period, with values stable between requests."""
+    events = []
+    for number in range(size):
+        country = countries[number % len(countries)]
+        ticker = f"{country.value}MOCK{number // len(countries) % 10}"
+        date = date_start + (date_end - date_start) * (number + 0.5) / size
+        date = date.replace(second=0, microsecond=0)
+        events.append(
+            {
+                "title": f"Mock indicator {ticker}",
+                "country": country.value,
+                "indicator": f"Mock indicator {number // len(countries) % 10}",
+                "ticker": ticker,
+                "actual": round(random.Random(f"{ticker}{date}").uniform(-10, 10), 1),
+                "forecast": None,
+                "currency": CURRENCIES[country].value,
+                "unit": "%",
+                "date": date.isoformat() + ".000Z",
+            }
+        )
+    return events
+
+
+async def events_handler(request: web.Request) -> web.Response:
+    """Serve events in the format of provider API."""
+    await asyncio.sleep(request.app[LATENCY])
+    if random.random() < request.app[ERROR_RATE]:
+        return web.json_response({"status": "error"}, status=500)
+    try:
+        date_start = parse_date(request.query["from"])
+        date_end = parse_date(request.query["to"])
+        countries = [
+            Country(country) for country in request.query.get("countries", "").split(",") if country
+        ] or list(Country)
+    except (KeyError, ValueError) as e:
+        raise web.HTTPBadRequest(text=f"Wrong argument value passed: {e}")
+    events = generate_events(date_start, date_end, countries, request.app[SIZE])
+    return web.json_response({"status": "ok", "result": events})
+
+
+def create_mock_app(latency: float = 0, size: int = 100, error_rate: float = 0) -> web.Application:
+    """Create web application mocking provider API.
+
+    Parameters
+    ----------
+    latency : float, optional
+        Number of seconds to wait before responding, by default 0
+    size : int, optional
+        Number of events in every response, by default 100
+    error_rate : float, optional
+        Share of requests to fail with server error, by default 0
+
+    Returns
+    -------
+    web.Application : Application ready to be served.
+    """
+    app = web.Application()
+    app[LATENCY] = latency
+    app[SIZE] = size
+    app[ERROR_RATE] = error_rate
+    app.add_routes([web.get("/events", events_handler)])
+    return app
+
+
+async def serve_mock(settings: Settings):
+    """Serve mock provider API until interrupted."""
+    runner = web.AppRunner(create_mock_app(settings.latency, settings.size, settings.error_rate))
+    await runner.setup()
+    await web.TCPSite(runner, settings.host, settings.port).start()
+    log.info(f"Serving mock provider on http://{settings.host}:{settings.port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
@@ -1,11 +1,11 @@
 import datetime
 from typing import List, Optional
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import ForeignKey, Index, func
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
-from .enums import Country, Currency
+from .enums import Country, Currency, JobStatus
 
 
 class BaseModel(AsyncAttrs, DeclarativeBase):
@@ -22,6 +22,9 @@ class IndicatorData(BaseModel):
     forecast: Mapped[Optional[float]]
     meta: Mapped["Indicator"] = relationship(back_populates="data")
 
+    # data points are read in date order, and paginated by date and ticker
+    __table_args__ = (Index("ix_indicator_data_date_ticker", "date", "ticker"),)
+
 
 class Indicator(BaseModel):
     __tablename__ = "indicator"
@@ -36,3 +39,57 @@ class Indicator(BaseModel):
     scale: Mapped[Optional[str]]
     title: Mapped[str]
     unit: Mapped[Optional[str]]
+
+
+class LatestIndicatorValue(BaseModel):
+    """Most recent data point of every indicator, maintained on each storage update."""
+
+    __tablename__ = "latest_indicator_value"
+
+    ticker: Mapped[str] = mapped_column(ForeignKey("indicator.ticker"), primary_key=True)
+    date: Mapped[datetime.datetime]
+    actual: Mapped[float]
+    forecast: Mapped[Optional[float]]
+
+
+class SyncWatermark(BaseModel):
+    """Period of time synced with data providers for a country."""
+
+    __tablename__ = "sync_watermark"
+
+    country: Mapped[Country] = mapped_column(primary_key=True)
+    date_start: Mapped[datetime.datetime] = mapped_column(primary_key=True)
+    date_end: Mapped[datetime.datetime]
+
+
+class ScheduledRelease(BaseModel):
+    """Upcoming release of indicator data, known from the economic calendar."""
+
+    __tablename__ = "scheduled_release"
+
+    ticker: Mapped[str] = mapped_column(primary_key=True)
+    date: Mapped[datetime.datetime] = mapped_column(primary_key=True, index=True)
+    country: Mapped[Country]
+
+
+class SyncJob(BaseModel):
+    """Journal of a long running sync, split into chunks to be able to resume it."""
+
+    __tablename__ = "sync_job"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(server_default=func.now())
+    date_start: Mapped[datetime.datetime]
+    date_end: Mapped[datetime.datetime]
+    # comma separated list of countries, empty for all of them
+    countries: Mapped[str]
+    chunks: Mapped[List["SyncJobChunk"]] = relationship()
+
+
+class SyncJobChunk(BaseModel):
+    __tablename__ = "sync_job_chunk"
+
+    job_id: Mapped[int] = mapped_column(ForeignKey("sync_job.id"), primary_key=True)
+    date_start: Mapped[datetime.datetime] = mapped_column(primary_key=True)
+    date_end: Mapped[datetime.datetime]
+    status: Mapped[JobStatus]
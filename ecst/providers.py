@@ -1,16 +1,35 @@
 import random
+from concurrent.futures import Executor
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 import aiohttp
 from pydantic import ValidationError
 
 from .enums import Country
+from .executors import run_batches
 from .logger import log
-from .schemas import DataProviderResult, Event
+from .schemas import DataProviderResponse, DataProviderResult, Event
+
+
+def parse_events(items: List[dict]) -> List[Event]:
+    """Validate raw events from provider response, which envelope is already validated.
+
+    Raises `ValueError` with description of the problem, that can be passed between processes.
+    """
+    try:
+        return DataProviderResult(status="ok", result=items).result
+    except ValidationError as error:
+        raise ValueError(str(error))
 
 
 class DataProvider:
+    # CPU bound parsing is offloaded to executor, if configured
+    executor: Optional[Executor] = None
+    batch_size: int = 1000
+    # base URL of provider API, may point to a mock server
+    url: str = "https://economic-calendar.tradingview.com"
+
     _user_agents = [
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/42.0.2311.135 Safari/537.36 Edge/12.246",  # noqa
         "Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/47.0.2526.111 Safari/537.36",  # noqa
@@ -51,7 +70,7 @@ class DataProvider:
         async with aiohttp.ClientSession() as session:
             events = []
             async with session.get(
-                "https://economic-calendar.tradingview.com/events",
+                f"{self.url}/events",
                 headers={"User-Agent": random.choice(self._user_agents)},
                 params={
                     "from": date_start.isoformat() + "Z",
@@ -59,12 +78,17 @@ class DataProvider:
                     "countries": ",".join(countries or [c.value for c in Country]),
                 },
             ) as resp:
+                if resp.status != 200:
+                    log.error(f"Provider responded with status {resp.status}")
+                    return False
                 res = await resp.json()
                 try:
-                    events = DataProviderResult(**res).result
-                    if not events:
-                        return []
-                except ValidationError as error:
+                    response = DataProviderResponse(**res)
+                    batches = await run_batches(
+                        self.executor, parse_events, response.result or [], self.batch_size
+                    )
+                    events = [event for batch in batches for event in batch]
+                except (ValidationError, ValueError) as error:
                     log.error("Error while parsing data: {}".format(str(error)))
                     return False
                 return events
@@ -1,14 +1,18 @@
+import base64
+import binascii
+import json
 import os
+import sys
 from datetime import datetime, timedelta
-from typing import Annotated, Dict, List, Optional, Tuple
+from typing import Annotated, Dict, List, NamedTuple, Optional, Tuple
 
 from pydantic import (BaseModel, ConfigDict, Field, PostgresDsn,
                       UrlConstraints, field_validator, model_validator)
 from pydantic_core import Url
 
-from ecst.models import Indicator, IndicatorData
+from ecst.models import Indicator, IndicatorData, ScheduledRelease
 
-from .enums import Country, Currency, OutputFormat, Period
+from .enums import Country, Currency, ExecutorType, OutputFormat, Period, Workload
 
 SQLiteDsn = Annotated[
     Url,
@@ -25,6 +29,12 @@ class Settings(BaseModel):
     storage: Optional[PostgresDsn | SQLiteDsn] = Field(
         default=os.environ.get("ECST_STORAGE", "sqlite+aiosqlite:///:memory:")
     )
+    replicas: Optional[List[PostgresDsn | SQLiteDsn]] = Field(
+        default=os.environ.get("ECST_REPLICAS", ""), validate_default=True
+    )
+    shards: Optional[Dict[Country, PostgresDsn | SQLiteDsn]] = Field(
+        default=os.environ.get("ECST_SHARDS", ""), validate_default=True
+    )
     date_start: Optional[datetime] = None
     date_end: Optional[datetime] = None
     days: int = Field(default=1, ge=0)
@@ -32,6 +42,59 @@ class Settings(BaseModel):
     countries: Optional[List[Country]] = []
     tickers: Optional[List[str]] = []
     no_sync: bool = False
+    chunk_days: int = Field(default=30, ge=1)
+    queue_size: int = Field(default=2, ge=1)
+    interval: int = Field(default=60, ge=1)
+    max_interval: int = Field(default=3600, ge=1)
+    host: str = "127.0.0.1"
+    port: int = Field(default=8080, ge=0, le=65535)
+    workers: int = Field(default=1, ge=1)
+    executor: ExecutorType = Field(
+        default=os.environ.get("ECST_EXECUTOR", ExecutorType.NONE), validate_default=True
+    )
+    executor_workers: Optional[int] = Field(default=None, ge=1)
+    batch_size: int = Field(default=1000, ge=1)
+    pool_size: Optional[int] = Field(
+        default=os.environ.get("ECST_POOL_SIZE"), ge=1, validate_default=True
+    )
+    max_overflow: Optional[int] = Field(
+        default=os.environ.get("ECST_MAX_OVERFLOW"), ge=0, validate_default=True
+    )
+    pool_timeout: Optional[float] = Field(
+        default=os.environ.get("ECST_POOL_TIMEOUT"), gt=0, validate_default=True
+    )
+    pool_recycle: Optional[int] = Field(
+        default=os.environ.get("ECST_POOL_RECYCLE"), validate_default=True
+    )
+    pool_pre_ping: Optional[bool] = Field(
+        default=os.environ.get("ECST_POOL_PRE_PING"), validate_default=True
+    )
+    query_cache_size: Optional[int] = Field(
+        default=os.environ.get("ECST_QUERY_CACHE_SIZE"), ge=0, validate_default=True
+    )
+    statement_cache_size: Optional[int] = Field(
+        default=os.environ.get("ECST_STATEMENT_CACHE_SIZE"), ge=0, validate_default=True
+    )
+    retention: Optional[Dict[str, int]] = {}
+    retention_days: Optional[int] = Field(default=None, ge=1)
+    archive: Optional[str] = None
+    no_vacuum: bool = False
+    resume: bool = False
+    limit: Optional[int] = Field(default=None, ge=1)
+    cursor: Optional[str] = None
+    search: Optional[str] = None
+    provider_url: Optional[str] = Field(default=os.environ.get("ECST_PROVIDER_URL"))
+    latency: float = Field(default=0, ge=0)
+    size: int = Field(default=100, ge=0)
+    error_rate: float = Field(default=0, ge=0, le=1)
+    workloads: List[Workload] = [Workload.QUERY]
+    concurrency: int = Field(default=10, ge=1)
+    requests: int = Field(default=100, ge=1)
+    window_days: int = Field(default=7, ge=1)
+    cache: Optional[str] = Field(default=os.environ.get("ECST_CACHE"))
+    cache_size: int = Field(
+        default=os.environ.get("ECST_CACHE_SIZE", 64 * 2**20), ge=0, validate_default=True
+    )
 
     @model_validator(mode="before")
     def parse_countries(values: dict):
@@ -40,6 +103,15 @@ class Settings(BaseModel):
             values["countries"] = values.get("countries").split(",")
         return values
 
+    @model_validator(mode="before")
+    def parse_retention(values: dict):
+        """Parse retention from comma separated string of `country or ticker=days` pairs."""
+        if isinstance(values.get("retention"), str):
+            values["retention"] = dict(
+                pair.split("=", 1) for pair in values.get("retention").split(",") if pair
+            )
+        return values
+
     @model_validator(mode="after")
     def parse_days(self):
         """Calculate date ranges based on days and starting point.
@@ -64,6 +136,27 @@ class Settings(BaseModel):
             self.date_start = self.date_end - timedelta(days=self.days)
         return self
 
+    @field_validator("replicas", mode="before")
+    def parse_replicas(cls, v):
+        """Parse replicas from comma separated string."""
+        if isinstance(v, str):
+            return [replica for replica in v.split(",") if replica]
+        return v
+
+    @field_validator("shards", mode="before")
+    def parse_shards(cls, v):
+        """Parse shards from comma separated string of `country=dsn` pairs."""
+        if isinstance(v, str):
+            return dict(pair.split("=", 1) for pair in v.split(",") if pair)
+        return v
+
+    @field_validator("cursor")
+    def check_cursor(cls, v):
+        """Make sure cursor was returned by previous query."""
+        if v is not None:
+            decode_cursor(v)
+        return v
+
     @field_validator("date_start", "date_end", mode="before")
     def parse_date(cls, v: datetime) -> datetime:
         """Parse date from string."""
@@ -116,11 +209,43 @@ class DataProviderResult(BaseModel):
     result: Optional[List[Event]] = []
 
 
+class DataProviderResponse(BaseModel):
+    """Envelope of TradingView API response, with events left raw to be validated in batches."""
+
+    status: str
+    result: Optional[List[dict]] = []
+
+
+class DataPoint:
+    """Compact record of indicator data, converted to a model only when written to storage."""
+
+    __slots__ = ("ticker", "date", "actual", "forecast")
+
+    def __init__(self, ticker: str, date: datetime, actual: float, forecast: Optional[float]):
+        self.ticker = ticker
+        self.date = date
+        self.actual = actual
+        self.forecast = forecast
+
+    def __getstate__(self):
+        return (self.ticker, self.date, self.actual, self.forecast)
+
+    def __setstate__(self, state):
+        self.ticker, self.date, self.actual, self.forecast = state
+        self.ticker = sys.intern(self.ticker)
+
+    def to_model(self) -> IndicatorData:
+        return IndicatorData(
+            ticker=self.ticker, date=self.date, actual=self.actual, forecast=self.forecast
+        )
+
+
 class Indicators(BaseModel):
     """Container to store indicators and metrics to easy sync with records, stored in database."""
 
     meta: Dict[str, Indicator]
-    data: Dict[Tuple[str, datetime], IndicatorData]
+    data: Dict[Tuple[str, datetime], DataPoint]
+    schedule: Dict[Tuple[str, datetime], ScheduledRelease] = {}
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -134,10 +259,27 @@ class QueryResultData(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class QueryRow(NamedTuple):
+    """Data point read from storage, without building result model."""
+
+    ticker: str
+    date: datetime
+    actual: float
+    forecast: Optional[float]
+
+
+class DataChange(QueryResultData):
+    """Data point that was inserted or changed in storage."""
+
+    country: Country = Field(title="Country")
+
+
 class QueryResult(BaseModel):
     """Result of query command."""
 
     data: Optional[List[QueryResultData]] = Field(default_factory=list)
+    # continuation token of the next page, if query was limited and there is more data
+    cursor: Optional[str] = None
 
     def model_dump_csv(self):
         result = [
@@ -236,3 +378,59 @@ class ListResult(BaseModel):
                 )
             )
         return "\n".join(result)
+
+
+class LoadTestResultData(BaseModel):
+    workload: Workload = Field(title="Workload")
+    requests: int = Field(title="Requests")
+    errors: int = Field(title="Errors")
+    throughput: float = Field(title="Req/s")
+    p50: float = Field(title="p50 ms")
+    p90: float = Field(title="p90 ms")
+    p99: float = Field(title="p99 ms")
+    max: float = Field(title="Max ms")
+
+
+class LoadTestResult(BaseModel):
+    """Result of load test command."""
+
+    data: Optional[List[LoadTestResultData]] = Field(default_factory=list)
+
+    def model_dump_csv(self):
+        fields = LoadTestResultData.model_fields
+        result = [",".join(field.title for field in fields.values())]
+        for row in self.data:
+            result.append(",".join(str(value) for value in row.model_dump(mode="json").values()))
+        return "\n".join(result)
+
+    def model_dump_text(self):
+        fields = LoadTestResultData.model_fields
+        result = ["\t".join("{:<8}".format(field.title) for field in fields.values())]
+        for row in self.data:
+            result.append(
+                "{:<8}\t{:<8}\t{:<8}\t{:<8.1f}\t{:<8.1f}\t{:<8.1f}\t{:<8.1f}\t{:.1f}".format(
+                    row.workload.value,
+                    row.requests,
+                    row.errors,
+                    row.throughput,
+                    row.p50,
+                    row.p90,
+                    row.p99,
+                    row.max,
+                )
+            )
+        return "\n".join(result)
+
+
+def encode_cursor(date: datetime, ticker: str) -> str:
+    """Encode position of the last returned data point into opaque continuation token."""
+    return base64.urlsafe_b64encode(json.dumps([date.isoformat(), ticker]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode continuation token into date and ticker of the last returned data point."""
+    try:
+        date, ticker = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(date), str(ticker)
+    except (binascii.Error, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
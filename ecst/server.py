@@ -0,0 +1,266 @@
+import asyncio
+import json
+import multiprocessing
+import socket
+from functools import partial
+from typing import List
+
+import aiohttp
+from aiohttp import web
+from pydantic import ValidationError
+
+from .encoders import QUERY_COLUMNS, dump_result, dump_rows
+from .enums import OutputFormat
+from .executors import run
+from .logger import log
+from .schemas import DataChange, QueryResult, Settings
+from .storages import Storage, is_memory
+
+STORAGE = web.AppKey("storage", Storage)
+READ_ONLY = web.AppKey("read_only", bool)
+
+
+def parse_settings(request: web.Request, multi: List[str] = []) -> Settings:
+    """Validate query string of request the same way as CLI arguments."""
+    params = {key: value for key, value in request.query.items() if key not in multi}
+    for key in multi:
+        if key in request.query:
+            params[key] = request.query.getall(key)
+    try:
+        return Settings(**params)
+    except ValidationError as e:
+        error = e.errors(include_url=False, include_context=False)[0]
+        raise web.HTTPBadRequest(
+            text="Wrong argument value passed ({}): {}".format(
+                error.get("loc", ("system",))[0], error.get("msg")
+            )
+        )
+
+
+async def json_response(request: web.Request, result) -> web.Response:
+    body = await run(request.app[STORAGE].executor, dump_result, result)
+    return web.Response(body=body, content_type="application/json")
+
+
+async def query_handler(request: web.Request) -> web.Response:
+    """Query data from storage for given range of dates.
+
+    Data is encoded straight from rows, as JSON or as JSON Lines if `format=jsonl`.
+    """
+    settings = parse_settings(request, multi=["tickers"])
+    rows, cursor = await request.app[STORAGE].query_rows(
+        date_start=settings.date_start,
+        date_end=settings.date_end,
+        countries=settings.countries,
+        tickers=settings.tickers,
+        no_sync=settings.no_sync or request.app[READ_ONLY],
+        limit=settings.limit,
+        cursor=settings.cursor,
+    )
+    lines = settings.format == OutputFormat.JSONL
+    body = await run(
+        request.app[STORAGE].executor,
+        partial(dump_rows, QUERY_COLUMNS, rows, lines, cursor=cursor),
+    )
+    if lines:
+        # cursor of the next page can't be a part of JSON Lines body
+        headers = {"X-Cursor": cursor} if cursor else {}
+        return web.Response(body=body, content_type="application/x-ndjson", headers=headers)
+    return web.Response(body=body, content_type="application/json")
+
+
+async def list_handler(request: web.Request) -> web.Response:
+    """List available indicators."""
+    settings = parse_settings(request)
+    result = await request.app[STORAGE].list(settings.countries, settings.search)
+    return await json_response(request, result)
+
+
+async def latest_handler(request: web.Request) -> web.Response:
+    """Show the most recent value of indicators."""
+    settings = parse_settings(request, multi=["tickers"])
+    result = await request.app[STORAGE].latest(
+        countries=settings.countries, tickers=settings.tickers
+    )
+    return await json_response(request, result)
+
+
+async def watch_handler(request: web.Request) -> web.StreamResponse:
+    """Stream changes in storage as server-sent events."""
+    settings = parse_settings(request, multi=["tickers"])
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await response.prepare(request)
+    async for changes in request.app[STORAGE].watch(
+        countries=settings.countries, tickers=settings.tickers
+    ):
+        data = dump_result(QueryResult(data=changes))
+        await response.write(b"data: " + data + b"\n\n")
+    return response
+
+
+async def sync_handler(request: web.Request) -> web.Response:
+    """Sync missing data of period on behalf of a worker process."""
+    settings = parse_settings(request)
+    synced = await request.app[STORAGE].sync_missing(
+        settings.date_start, settings.date_end, settings.countries
+    )
+    return web.json_response({"synced": synced})
+
+
+def create_app(
+    storage: Storage, interval: int = 0, max_interval: int = 3600, read_only: bool = False
+) -> web.Application:
+    """Create web application serving storage.
+
+    Parameters
+    ----------
+    storage : Storage
+        Connected data storage.
+    interval : int, optional
+        Number of seconds between syncs around releases, by default 0 (disabled)
+    max_interval : int, optional
+        Maximum number of seconds between syncs, by default 3600
+    read_only : bool, optional
+        Never sync data with provider while serving requests, by default False
+
+    Returns
+    -------
+    web.Application : Application ready to be served.
+    """
+    app = web.Application()
+    app[STORAGE] = storage
+    app[READ_ONLY] = read_only
+    app.add_routes(
+        [
+            web.get("/query", query_handler),
+            web.get("/list", list_handler),
+            web.get("/latest", latest_handler),
+            web.get("/watch", watch_handler),
+        ]
+    )
+
+    async def poll(app: web.Application):
+        task = None
+        if interval:
+            task = asyncio.create_task(
+                storage.poll(interval=interval, max_interval=max_interval)
+            )
+        yield
+        if task:
+            task.cancel()
+
+    app.cleanup_ctx.append(poll)
+    return app
+
+
+async def serve(settings: Settings):
+    """Serve storage over HTTP until cancelled."""
+    if settings.workers > 1:
+        return await serve_workers(settings)
+
+    storage = Storage.from_settings(settings)
+    await storage.connect()
+    runner = web.AppRunner(create_app(storage, settings.interval, settings.max_interval))
+    await runner.setup()
+    await web.TCPSite(runner, settings.host, settings.port).start()
+    log.info(f"Serving on http://{settings.host}:{settings.port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def serve_workers(settings: Settings):
+    """Serve storage with a pool of worker processes sharing one listening socket.
+
+    The current process is the single writer, that keeps storage in sync with provider.
+    Workers route syncs of missing data to it, and receive changes it writes,
+    over an internal HTTP server listening on localhost.
+    """
+    if any(is_memory(dsn) for dsn in [settings.storage, *(settings.shards or {}).values()]):
+        raise ValueError("Multiple workers require storage shared between processes")
+
+    storage = Storage.from_settings(settings)
+    await storage.connect()
+    # workers are stopped before the writer, so streams of changes have nobody to wait for
+    runner = web.AppRunner(create_writer_app(storage), shutdown_timeout=1)
+    await runner.setup()
+    writer_sock = socket.create_server(("127.0.0.1", 0))
+    await web.SockSite(runner, writer_sock).start()
+    writer = f"http://127.0.0.1:{writer_sock.getsockname()[1]}"
+
+    sock = socket.create_server((settings.host, settings.port))
+    # fork is unsafe with running event loop, so workers are started from scratch
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=run_worker, args=(settings, sock, writer), daemon=True)
+        for _ in range(settings.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    log.info(f"Serving on http://{settings.host}:{settings.port} with {len(workers)} workers")
+    try:
+        if settings.interval:
+            await storage.poll(interval=settings.interval, max_interval=settings.max_interval)
+        else:
+            await asyncio.Event().wait()
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.join()
+        sock.close()
+        await runner.cleanup()
+
+
+def create_writer_app(storage: Storage) -> web.Application:
+    """Create internal web application of the single writer, serving worker processes."""
+    app = web.Application()
+    app[STORAGE] = storage
+    app.add_routes([web.post("/sync", sync_handler), web.get("/watch", watch_handler)])
+    return app
+
+
+def run_worker(settings: Settings, sock: socket.socket, writer: str):
+    """Entrypoint of a worker process."""
+    asyncio.run(serve_socket(settings, sock, writer))
+
+
+async def serve_socket(settings: Settings, sock: socket.socket, writer: str):
+    """Serve storage on already listening socket, routing writes to the writer process."""
+    # each worker has its own engine and connection pool
+    storage = Storage.from_settings(settings, writer=writer)
+    await storage.connect()
+    runner = web.AppRunner(create_app(storage))
+    await runner.setup()
+    # changes are relayed before serving requests, so watchers don't miss any of them
+    subscribed = asyncio.Event()
+    relay = asyncio.create_task(relay_changes(storage, writer, subscribed))
+    await subscribed.wait()
+    await web.SockSite(runner, sock).start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        relay.cancel()
+        await runner.cleanup()
+
+
+async def relay_changes(storage: Storage, writer: str, subscribed: asyncio.Event):
+    """Publish changes written by the writer process to watchers of this worker."""
+    # stream of changes never ends, so it has no timeout
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None)) as session:
+        while True:
+            try:
+                async with session.get(f"{writer}/watch") as response:
+                    response.raise_for_status()
+                    subscribed.set()
+                    buffer = b""
+                    # batches of changes may be longer than a line read at once
+                    async for chunk in response.content.iter_any():
+                        *events, buffer = (buffer + chunk).split(b"\n\n")
+                        for event in events:
+                            data = json.loads(event.removeprefix(b"data: "))["data"]
+                            storage.bus.publish([DataChange(**change) for change in data])
+                log.warning("Writer closed stream of changes, reconnecting ...")
+            except aiohttp.ClientError as e:
+                log.warning(f"Stream of changes from writer failed, reconnecting: {e}")
+            await asyncio.sleep(1)
@@ -0,0 +1,157 @@
+"""Prebuilt statements for hot storage queries.
+
+Statements are built once and take values as bound parameters, so neither Python
+overhead of building them nor SQLAlchemy compiled cache lookups depend on call arguments.
+"""
+from functools import lru_cache
+
+from sqlalchemy import (DateTime, Select, String, bindparam, column, func, literal_column,
+                        select, table, text, tuple_)
+
+from .models import (Indicator, IndicatorData, LatestIndicatorValue, ScheduledRelease,
+                     SyncWatermark)
+
+COUNTRIES = bindparam("countries", expanding=True)
+TICKERS = bindparam("tickers", expanding=True)
+DATE_START = bindparam("date_start")
+DATE_END = bindparam("date_end")
+# row value comparison doesn't pass column types to parameters, so they are set explicitly
+CURSOR_DATE = bindparam("cursor_date", type_=DateTime())
+CURSOR_TICKER = bindparam("cursor_ticker", type_=String())
+LIMIT = bindparam("limit")
+
+# Full text index of indicators in SQLite, kept in sync with `indicator` table by triggers
+INDICATOR_SEARCH = table("indicator_search", column("rowid"), column("rank"))
+# Searchable text of indicator, the same expression is indexed with pg_trgm in Postgres
+SEARCH_DOCUMENT = literal_column(
+    "lower(indicator.ticker || ' ' || indicator.title || ' ' || indicator.indicator)"
+)
+
+
+@lru_cache(maxsize=None)
+def list_statement(by_countries: bool) -> Select:
+    """Select indicators, optionally filtered by `countries`."""
+    q = select(Indicator)
+    if by_countries:
+        q = q.filter(Indicator.country.in_(COUNTRIES))
+    return q
+
+
+@lru_cache(maxsize=None)
+def search_statement(dialect: str, by_countries: bool, terms: int) -> Select:
+    """Select indicators matching search terms with full text index of the dialect.
+
+    SQLite takes FTS5 query in `search`, and other dialects take LIKE patterns
+    of each term in `term_0`, `term_1`, etc.
+    """
+    q = list_statement(by_countries)
+    if dialect == "sqlite":
+        return (
+            q.join(INDICATOR_SEARCH, INDICATOR_SEARCH.c.rowid == literal_column("indicator.rowid"))
+            .filter(text("indicator_search MATCH :search"))
+            .order_by(INDICATOR_SEARCH.c.rank)
+        )
+    for number in range(terms):
+        q = q.filter(SEARCH_DOCUMENT.contains(bindparam(f"term_{number}"), escape="\\"))
+    return q.order_by(Indicator.ticker)
+
+
+@lru_cache(maxsize=None)
+def query_statement(by_countries: bool, by_tickers: bool) -> Select:
+    """Select `(ticker, date, actual, forecast)` rows between `date_start` and `date_end`."""
+    q = (
+        select(
+            IndicatorData.ticker,
+            IndicatorData.date,
+            IndicatorData.actual,
+            IndicatorData.forecast,
+        )
+        .filter(IndicatorData.date.between(DATE_START, DATE_END))
+        .order_by(IndicatorData.date)
+    )
+    if by_countries:
+        q = q.join(Indicator).filter(Indicator.country.in_(COUNTRIES))
+    if by_tickers:
+        q = q.filter(IndicatorData.ticker.in_(TICKERS))
+    return q
+
+
+@lru_cache(maxsize=None)
+def page_statement(by_countries: bool, by_tickers: bool, by_cursor: bool) -> Select:
+    """Select up to `limit` data points ordered by date and ticker.
+
+    Page starts right after data point of `cursor_date` and `cursor_ticker`,
+    so it is found with the index instead of skipping previous rows.
+    """
+    q = query_statement(by_countries, by_tickers).order_by(IndicatorData.ticker)
+    if by_cursor:
+        q = q.filter(
+            tuple_(IndicatorData.date, IndicatorData.ticker) > tuple_(CURSOR_DATE, CURSOR_TICKER)
+        )
+    return q.limit(LIMIT)
+
+
+@lru_cache(maxsize=None)
+def latest_statement(by_countries: bool, by_tickers: bool) -> Select:
+    """Select the latest data point of indicators."""
+    q = select(LatestIndicatorValue).order_by(LatestIndicatorValue.ticker)
+    if by_countries:
+        q = q.join(Indicator).filter(Indicator.country.in_(COUNTRIES))
+    if by_tickers:
+        q = q.filter(LatestIndicatorValue.ticker.in_(TICKERS))
+    return q
+
+
+# Synced periods of `countries`
+WATERMARKS = select(
+    SyncWatermark.country, SyncWatermark.date_start, SyncWatermark.date_end
+).filter(SyncWatermark.country.in_(COUNTRIES))
+
+# Boundaries of stored data of `countries`
+DATA_BOUNDARIES = (
+    select(Indicator.country, func.min(IndicatorData.date), func.max(IndicatorData.date))
+    .join(Indicator)
+    .filter(Indicator.country.in_(COUNTRIES))
+    .group_by(Indicator.country)
+)
+
+# Stored meta data of indicators out of `tickers`
+EXISTING_TICKERS = select(
+    Indicator.ticker,
+    Indicator.country,
+    Indicator.currency,
+    Indicator.indicator,
+    Indicator.period,
+    Indicator.scale,
+    Indicator.title,
+    Indicator.unit,
+).filter(Indicator.ticker.in_(TICKERS))
+
+# Stored data points of `tickers` between `date_start` and `date_end`
+EXISTING_DATA = select(
+    IndicatorData.ticker,
+    IndicatorData.date,
+    IndicatorData.actual,
+    IndicatorData.forecast,
+).filter(
+    IndicatorData.ticker.in_(TICKERS),
+    IndicatorData.date.between(DATE_START, DATE_END),
+)
+
+# Scheduled releases of `tickers` between `date_start` and `date_end`
+EXISTING_RELEASES = select(
+    ScheduledRelease.ticker,
+    ScheduledRelease.date,
+    ScheduledRelease.country,
+).filter(
+    ScheduledRelease.ticker.in_(TICKERS),
+    ScheduledRelease.date.between(DATE_START, DATE_END),
+)
+
+# Latest data points of `tickers`
+LATEST_DATES = select(
+    LatestIndicatorValue.ticker,
+    LatestIndicatorValue.date,
+    LatestIndicatorValue.actual,
+    LatestIndicatorValue.forecast,
+).filter(LatestIndicatorValue.ticker.in_(TICKERS))
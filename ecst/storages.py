@@ -1,49 +1,395 @@
 import asyncio
-from collections import defaultdict
-from datetime import datetime
-from typing import List, Tuple
+import gzip
+import heapq
+import json
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import Executor
+from datetime import datetime, timedelta, timezone
+from itertools import cycle
+from typing import (AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set,
+                    Tuple)
 
+import aiohttp
 from pydantic import PostgresDsn
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy import (ColumnElement, and_, delete, false, func, insert, literal, make_url,
+                        or_, select, text, tuple_, union_all, update)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from .enums import Country
+from . import __version__, statements
+from .bus import EventBus
+from .cache import ResultCache
+from .enums import Country, JobStatus
+from .executors import create_executor, run_batches
 from .logger import log
-from .models import BaseModel, Indicator, IndicatorData
+from .models import (BaseModel, Indicator, IndicatorData, LatestIndicatorValue,
+                     ScheduledRelease, SyncJob, SyncJobChunk, SyncWatermark)
 from .providers import DataProvider
-from .schemas import (Event, Indicators, ListResult, QueryResult,
-                      QueryResultData, SQLiteDsn)
+from .schemas import (DataChange, DataPoint, Event, Indicators, ListResult,
+                      QueryResult, QueryResultData, QueryRow, Settings, SQLiteDsn,
+                      decode_cursor, encode_cursor)
+
+BULK_INDICATOR_COLUMNS = [
+    "ticker",
+    "country",
+    "currency",
+    "indicator",
+    "period",
+    "scale",
+    "title",
+    "unit",
+]
+
+# Production presets of engine options per database backend,
+# SQLite has none, as SQLAlchemy defaults already suit a local file
+ENGINE_PRESETS = {
+    "postgresql": {
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+    },
+}
+
+# Key of Postgres advisory lock, taken while synced periods are updated
+WATERMARKS_LOCK = 0x65637374
+
+# Statements creating search index of indicators per database backend
+SEARCH_INDEX = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE indicator_search USING fts5("
+        "ticker, title, indicator, content='indicator', tokenize='trigram')",
+        "CREATE TRIGGER indicator_search_insert AFTER INSERT ON indicator BEGIN "
+        "INSERT INTO indicator_search(rowid, ticker, title, indicator) "
+        "VALUES (new.rowid, new.ticker, new.title, new.indicator); END",
+        "CREATE TRIGGER indicator_search_delete AFTER DELETE ON indicator BEGIN "
+        "INSERT INTO indicator_search(indicator_search, rowid, ticker, title, indicator) "
+        "VALUES ('delete', old.rowid, old.ticker, old.title, old.indicator); END",
+        "CREATE TRIGGER indicator_search_update AFTER UPDATE ON indicator BEGIN "
+        "INSERT INTO indicator_search(indicator_search, rowid, ticker, title, indicator) "
+        "VALUES ('delete', old.rowid, old.ticker, old.title, old.indicator); "
+        "INSERT INTO indicator_search(rowid, ticker, title, indicator) "
+        "VALUES (new.rowid, new.ticker, new.title, new.indicator); END",
+        # index indicators that were stored before the index was created
+        "INSERT INTO indicator_search(indicator_search) VALUES ('rebuild')",
+    ],
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_indicator_search ON indicator USING gin ("
+        "lower(ticker || ' ' || title || ' ' || indicator) gin_trgm_ops)",
+    ],
+}
+
+# Connection arguments to control prepared statement cache of database drivers
+STATEMENT_CACHE_ARGS = {
+    "asyncpg": "prepared_statement_cache_size",
+    "aiosqlite": "cached_statements",
+}
+
+
+def naive_utc(date: datetime) -> datetime:
+    """Convert date to UTC without timezone, as dates are stored. Naive dates are kept as is."""
+    if date.tzinfo is None:
+        return date
+    return date.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def is_memory(dsn: str) -> bool:
+    """Check if connection string points to in-memory SQLite database."""
+    url = make_url(str(dsn))
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(dsn: str, statement_cache_size: Optional[int] = None, **options) -> Dict:
+    """Combine engine options with presets for the database backend.
+
+    Options set to None are taken from presets, or left to SQLAlchemy defaults.
+
+    Parameters
+    ----------
+    dsn : str
+        Database connection string.
+    statement_cache_size : Optional[int], optional
+        Size of prepared statements cache of database driver, by default None
+    **options
+        Options of `create_async_engine`.
+
+    Returns
+    -------
+    Dict : Options to create engine with.
+    """
+    url = make_url(dsn)
+    result = {**ENGINE_PRESETS.get(url.get_backend_name(), {})}
+    result.update({key: value for key, value in options.items() if value is not None})
+    if is_memory(dsn):
+        # in-memory database lives in a single connection, which concurrent sessions
+        # would interleave their statements on, so they wait for it in a pool of one
+        result.update(poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0)
+        result.pop("pool_recycle", None)
+    if statement_cache_size is not None and url.get_driver_name() in STATEMENT_CACHE_ARGS:
+        result["connect_args"] = {
+            STATEMENT_CACHE_ARGS[url.get_driver_name()]: statement_cache_size
+        }
+    return result
 
 
 class Storage(DataProvider):
-    def __init__(self, dsn: PostgresDsn | SQLiteDsn):
-        self.engine = create_async_engine(dsn)
+    def __init__(
+        self,
+        dsn: PostgresDsn | SQLiteDsn,
+        replicas: List[PostgresDsn | SQLiteDsn] = [],
+        executor: Optional[Executor] = None,
+        batch_size: int = 1000,
+        chunk_days: int = 30,
+        queue_size: int = 2,
+        provider_url: Optional[str] = None,
+        cache: Optional[ResultCache] = None,
+        writer: Optional[str] = None,
+        **options,
+    ):
+        self.executor = executor
+        # URL of the single writer process, that syncs missing data instead of this one
+        self.writer = writer
+        # results of in-memory database can't be shared with other processes
+        self.cache = None if is_memory(dsn) else cache
+        self.batch_size = batch_size
+        if provider_url:
+            self.url = provider_url.rstrip("/")
+        # size of chunks synced with provider and number of chunks waiting for the next stage
+        self.chunk_days = chunk_days
+        self.queue_size = queue_size
+        self.engine = create_async_engine(str(dsn), **engine_options(str(dsn), **options))
         self.session = async_sessionmaker(self.engine, expire_on_commit=False)
+        # reads are balanced between replicas, if there are any
+        self.replicas = [
+            create_async_engine(str(replica), **engine_options(str(replica), **options))
+            for replica in replicas
+        ]
+        self.replica_sessions = cycle(
+            [async_sessionmaker(engine, expire_on_commit=False) for engine in self.replicas]
+            or [self.session]
+        )
+        # syncs that are currently running, keyed by period and countries
+        self.in_flight: Dict[Tuple[datetime, datetime, Tuple[Country, ...]], asyncio.Task] = {}
+        self.write_lock = asyncio.Lock()
+        self.bus = EventBus()
+        # number of inserted, updated and unchanged data points written by `update`
+        self.write_stats: Counter = Counter()
+        # set on connect, if database supports search index
+        self.search_index = False
+
+    @classmethod
+    def from_settings(cls, settings: Settings, writer: Optional[str] = None) -> "Storage":
+        """Create storage configured with CLI arguments, routing syncs to writer if given."""
+        options = dict(
+            replicas=settings.replicas,
+            executor=create_executor(settings.executor, settings.executor_workers),
+            batch_size=settings.batch_size,
+            chunk_days=settings.chunk_days,
+            queue_size=settings.queue_size,
+            pool_size=settings.pool_size,
+            max_overflow=settings.max_overflow,
+            pool_timeout=settings.pool_timeout,
+            pool_recycle=settings.pool_recycle,
+            pool_pre_ping=settings.pool_pre_ping,
+            query_cache_size=settings.query_cache_size,
+            statement_cache_size=settings.statement_cache_size,
+            provider_url=settings.provider_url,
+            cache=ResultCache(settings.cache, settings.cache_size) if settings.cache else None,
+            writer=writer,
+        )
+        if settings.shards:
+            return ShardedStorage(settings.storage, settings.shards, **options)
+        return cls(settings.storage, **options)
+
+    def read_session(self, primary: bool = False) -> AsyncSession:
+        """Create session to read data from the next replica, or from primary storage."""
+        return self.session() if primary else next(self.replica_sessions)()
+
+    def cache_key(self, key: Tuple) -> str:
+        """Make key of cached result unique for storage and version of the package."""
+        return repr((__version__, self.engine.url.render_as_string(), *key))
+
+    async def cached(
+        self,
+        key: Tuple,
+        read: Callable[[], Awaitable],
+        prepare: Optional[Callable[[], Awaitable]] = None,
+    ):
+        """Return result cached since the last storage update, or read and cache it.
+
+        Cache is missed before `prepare` is called, so updates it makes to storage
+        don't invalidate the result that is read after them. If `prepare` returns
+        a false value, storage is not ready yet, and the result is read without caching.
+        """
+        if self.cache is None:
+            if prepare:
+                await prepare()
+            return await read()
+        key = self.cache_key(key)
+        result = self.cache.get(key)
+        if result is None:
+            if prepare and not await prepare():
+                return await read()
+            generation = self.cache.generation()
+            result = await read()
+            self.cache.put(key, result, generation)
+        return result
 
     async def connect(self):
         log.info("Connecting to data storage ...")
+        key = self.cache_key(("connect",))
+        if self.cache is not None and (search_index := self.cache.get(key)) is not None:
+            # schema was already created by one of the previous processes,
+            # unless database was removed or recreated since then
+            if await self.schema_exists(search_index):
+                self.search_index = search_index
+                return
         async with self.engine.begin() as conn:
             await conn.run_sync(BaseModel.metadata.create_all)
+            # storages created before the latest values table was introduced
+            # need it to be populated once from the existing data
+            latest = await conn.execute(select(func.count()).select_from(LatestIndicatorValue))
+            if not latest.scalar():
+                await conn.execute(self._rebuild_latest_query())
+        self.search_index = await self.create_search_index()
+        if self.cache is not None:
+            self.cache.put(key, self.search_index)
 
-    async def list(self, countries: List[Country] = []) -> ListResult:
+    async def schema_exists(self, search_index: bool = False) -> bool:
+        """Check with a single statement that all tables of storage exist.
+
+        Parameters
+        ----------
+        search_index : bool, optional
+            Check search index table as well, by default False
+
+        Returns
+        -------
+        bool : True if storage is ready to use without creating the schema.
+        """
+        tables = list(BaseModel.metadata.sorted_tables)
+        if search_index and self.engine.dialect.name == "sqlite":
+            tables.append(statements.INDICATOR_SEARCH)
+        q = union_all(*[select(literal(1)).select_from(table).where(false()) for table in tables])
+        try:
+            async with self.engine.connect() as conn:
+                await conn.execute(q)
+            return True
+        except DBAPIError:
+            return False
+
+    async def create_search_index(self) -> bool:
+        """Create search index of indicators, if database supports it.
+
+        Returns
+        -------
+        bool : True if search index is available, otherwise catalog is searched in memory.
+        """
+        dialect = self.engine.dialect.name
+        if dialect not in SEARCH_INDEX:
+            return False
+        try:
+            async with self.engine.begin() as conn:
+                if dialect == "sqlite":
+                    exists = await conn.execute(
+                        text("SELECT 1 FROM sqlite_master WHERE name = 'indicator_search'")
+                    )
+                    if exists.scalar():
+                        return True
+                for statement in SEARCH_INDEX[dialect]:
+                    await conn.execute(text(statement))
+            return True
+        except DBAPIError as e:
+            log.warning(f"Search index is not available, catalog will be searched in memory: {e}")
+            return False
+
+    def _rebuild_latest_query(self, tickers: Optional[List[str]] = None):
+        """Build a statement that fills latest values table from indicator data.
+
+        Only latest values of given tickers are filled, if any.
+        """
+        newest = select(IndicatorData.ticker, func.max(IndicatorData.date).label("date"))
+        if tickers is not None:
+            newest = newest.filter(IndicatorData.ticker.in_(tickers))
+        newest = newest.group_by(IndicatorData.ticker).subquery()
+        q = select(
+            IndicatorData.ticker, IndicatorData.date, IndicatorData.actual, IndicatorData.forecast
+        ).join(
+            newest,
+            and_(IndicatorData.ticker == newest.c.ticker, IndicatorData.date == newest.c.date),
+        )
+        return insert(LatestIndicatorValue).from_select(
+            ["ticker", "date", "actual", "forecast"], q
+        )
+
+    async def list(self, countries: List[Country] = [], search: Optional[str] = None) -> ListResult:
         """List of all available indicators.
 
         Parameters
         ----------
         countries : List[Country], optional
             List of countries to query, by default []
+        search : Optional[str], optional
+            Words to look for in ticker, title and indicator name, by default None (all).
+            Indicators that contain all of the words are returned, most relevant first.
 
         Returns
         -------
         ListResult: List of indicators.
         """
-        async with self.session() as session:
+        return await self.cached(
+            ("list", countries, search), lambda: self.read_list(countries, search)
+        )
+
+    async def read_list(
+        self, countries: List[Country] = [], search: Optional[str] = None
+    ) -> ListResult:
+        """Read indicators of `list` from storage."""
+        terms = search.lower().split() if search else []
+        dialect = self.engine.dialect.name
+        # trigram index of SQLite can't find words shorter than 3 characters
+        if terms and self.search_index and (dialect != "sqlite" or min(map(len, terms)) >= 3):
+            return await self.search(terms, countries)
+
+        async with self.read_session() as session:
             async with session.begin():
-                q = select(Indicator)
-                if countries:
-                    q = q.filter(Indicator.country.in_(countries))
-                result = await session.execute(q)
-                return ListResult(data=result.scalars().all() or [])
+                result = await session.execute(
+                    statements.list_statement(bool(countries)), {"countries": countries}
+                )
+                catalog = result.scalars().all() or []
+        if terms:
+            catalog = [
+                row
+                for row in catalog
+                if all(
+                    term in f"{row.ticker} {row.title} {row.indicator}".lower() for term in terms
+                )
+            ]
+        return ListResult(data=catalog)
+
+    async def search(self, terms: List[str], countries: List[Country] = []) -> ListResult:
+        """Find indicators containing all of the lowercase terms, using search index."""
+        dialect = self.engine.dialect.name
+        params = {"countries": countries}
+        if dialect == "sqlite":
+            # every term is quoted as FTS5 string, matching it anywhere in the text
+            params["search"] = " ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+        else:
+            for number, term in enumerate(terms):
+                params[f"term_{number}"] = (
+                    term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                )
+        async with self.read_session() as session:
+            async with session.begin():
+                result = await session.execute(
+                    statements.search_statement(dialect, bool(countries), len(terms)), params
+                )
+                return ListResult(data=result.scalars().all())
 
     async def query(
         self,
@@ -52,6 +398,8 @@ class Storage(DataProvider):
         countries: List[Country] = [],
         tickers: List[str] = [],
         no_sync: bool = False,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
     ) -> QueryResult:
         """
         Query data storage for events in period.
@@ -71,32 +419,348 @@ class Storage(DataProvider):
             List of tickers to query, by default []
         no_sync : bool, optional
             Do not sync data from providers, by default False
+        limit : Optional[int], optional
+            Maximum number of data points to return, by default None (all of them).
+            If there are more, result contains a cursor of the next page.
+        cursor : Optional[str], optional
+            Cursor returned with the previous page, by default None (first page).
+            Period is synced with the first page, so next pages are read as is.
+
+        """
+        rows, cursor = await self.query_rows(
+            date_start, date_end, countries, tickers, no_sync, limit, cursor
+        )
+        return QueryResult(
+            data=[
+                QueryResultData(ticker=ticker, date=date, actual=actual, forecast=forecast)
+                for ticker, date, actual, forecast in rows
+            ],
+            cursor=cursor,
+        )
+
+    async def query_rows(
+        self,
+        date_start: datetime,
+        date_end: datetime,
+        countries: List[Country] = [],
+        tickers: List[str] = [],
+        no_sync: bool = False,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Tuple[str, datetime, float, Optional[float]]], Optional[str]]:
+        """
+        Query data storage for events in period, without building result models.
+
+        Takes the same arguments as `query`, and is used to encode large results
+        straight from `(ticker, date, actual, forecast)` rows.
+
+        Returns
+        -------
+        List[Tuple[str, datetime, float, Optional[float]]] : Rows of data points.
+        Optional[str] : Cursor of the next page, if there is more data.
+        """
+        date_start = naive_utc(date_start)
+        date_end = naive_utc(date_end)
+        sync = not no_sync and not cursor
+        prepare = (lambda: self.sync_missing(date_start, date_end, countries)) if sync else None
+        # read your own writes from primary after sync
+        args = (date_start, date_end, countries, tickers, not no_sync, limit, cursor)
+        # data of past periods changes only with storage updates, that invalidate cache,
+        # while periods reaching the future have to be synced with provider every time
+        if self.cache is not None and not (sync and date_end > datetime.utcnow()):
+            return await self.cached(
+                ("query_rows", *args), lambda: self.read_cacheable_rows(*args), prepare
+            )
+        if prepare:
+            await prepare()
+        return await self.read_rows(*args)
+
+    async def read_rows(
+        self,
+        date_start: datetime,
+        date_end: datetime,
+        countries: List[Country],
+        tickers: List[str],
+        primary: bool,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Tuple[str, datetime, float, Optional[float]]], Optional[str]]:
+        """Read rows of `query_rows` from storage, without syncing them."""
+        params = {
+            "date_start": date_start,
+            "date_end": date_end,
+            "countries": countries,
+            "tickers": tickers,
+        }
+        statement = statements.query_statement(bool(countries), bool(tickers))
+        if limit:
+            statement = statements.page_statement(bool(countries), bool(tickers), bool(cursor))
+            # one more row tells whether there is a next page
+            params["limit"] = limit + 1
+            if cursor:
+                params["cursor_date"], params["cursor_ticker"] = decode_cursor(cursor)
+
+        async with self.read_session(primary=primary) as session:
+            async with session.begin():
+                result = await session.execute(statement, params)
+                return self.paginate(result.all(), limit)
+
+    async def read_cacheable_rows(self, *args) -> Tuple[List[QueryRow], Optional[str]]:
+        """Read rows of `query_rows` as plain tuples, that are much smaller to cache."""
+        rows, cursor = await self.read_rows(*args)
+        return [QueryRow(*row) for row in rows], cursor
+
+    def paginate(
+        self, rows: List[Tuple], limit: Optional[int], more: bool = False
+    ) -> Tuple[List[Tuple], Optional[str]]:
+        """Cut rows to the page size, adding cursor of the next page if there is more data."""
+        if not limit or (len(rows) <= limit and not more):
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].date, rows[-1].ticker)
+
+    async def query_many(
+        self,
+        specs: List[Tuple[List[str], List[Country], datetime, datetime]],
+        no_sync: bool = False,
+    ) -> List[QueryResult]:
+        """
+        Query data storage for several windows at once.
+
+        All windows are synced with a single coalesced plan and queried with
+        a single `UNION ALL` statement, so only one round trip is made.
+
+        Parameters
+        ----------
+        specs : List[Tuple[List[str], List[Country], datetime, datetime]]
+            List of `(tickers, countries, date_start, date_end)` windows to query.
+        no_sync : bool, optional
+            Do not sync data from providers, by default False
 
+        Returns
+        -------
+        List[QueryResult]: Results in the same order as specs.
         """
+        if not specs:
+            return []
+
         if not no_sync:
-            log.info(f"Sync data for {date_start:%d.%m.%Y %H:%I:%S} - {date_end:%d.%m.%Y %H:%I:%S}")
-            # get only dates that are not in storage
-            dates = await self.dates_to_sync(date_start, date_end)
-            tasks = [self.sync(*date, countries=countries) for date in dates]
-            await asyncio.gather(*tasks)
+            # any window without countries requires to sync all of them
+            countries = set()
+            for _, spec_countries, _, _ in specs:
+                if not spec_countries:
+                    countries = set()
+                    break
+                countries.update(spec_countries)
+            windows = self.merge_ranges([(spec[2], spec[3]) for spec in specs])
+            await asyncio.gather(
+                *[self.sync_missing(*window, sorted(countries)) for window in windows]
+            )
 
-        # query data from Storage
-        async with self.session() as session:
+        selects = []
+        for index, (tickers, countries, date_start, date_end) in enumerate(specs):
+            q = select(
+                literal(index).label("spec"),
+                IndicatorData.ticker,
+                IndicatorData.date,
+                IndicatorData.actual,
+                IndicatorData.forecast,
+            ).filter(IndicatorData.date.between(date_start, date_end))
+            if countries:
+                q = q.join(Indicator).filter(Indicator.country.in_(countries))
+
+            if tickers:
+                q = q.filter(IndicatorData.ticker.in_(tickers))
+            selects.append(q)
+
+        q = union_all(*selects).order_by("spec", "date")
+        results = [QueryResult() for _ in specs]
+        # read your own writes from primary after sync
+        async with self.read_session(primary=not no_sync) as session:
             async with session.begin():
-                q = (
-                    select(IndicatorData)
-                    .filter(
-                        IndicatorData.date.between(date_start, date_end),
+                for spec, ticker, date, actual, forecast in await session.execute(q):
+                    results[spec].data.append(
+                        QueryResultData(ticker=ticker, date=date, actual=actual, forecast=forecast)
                     )
-                    .order_by(IndicatorData.date)
-                )
-                if countries:
-                    q = q.join(Indicator).filter(Indicator.country.in_(countries))
+        return results
 
-                if tickers:
-                    q = q.filter(IndicatorData.ticker.in_(tickers))
+    async def sync_missing(
+        self, date_start: datetime, date_end: datetime, countries: List[Country] = []
+    ) -> bool:
+        """
+        Sync only those parts of the period that are not in storage yet.
+
+        Parameters
+        ----------
+        date_start : datetime
+            Start date of the period.
+        date_end : datetime
+            End date of the period.
+        countries : List[Country], optional
+            List of countries to query, by default []
+
+        Returns
+        -------
+        bool : True if the whole period is synced, False if some parts failed to be fetched.
+        """
+        log.info(f"Sync data for {date_start:%d.%m.%Y %H:%I:%S} - {date_end:%d.%m.%Y %H:%I:%S}")
+        # get only dates and countries that are not in storage, and fetch them in parallel
+        plan = await self.dates_to_sync(date_start, date_end, countries)
+        if not plan:
+            return True
+        if self.writer:
+            return await self.sync_writer(date_start, date_end, countries)
+        tasks = [self.sync_once(*dates, countries=shard) for dates, shard in plan.items()]
+        await asyncio.gather(*tasks)
+        # periods that failed to be fetched are not marked as synced
+        return not await self.dates_to_sync(date_start, date_end, countries, primary=True)
+
+    async def sync_writer(
+        self, date_start: datetime, date_end: datetime, countries: List[Country] = []
+    ) -> bool:
+        """
+        Ask the single writer process to sync missing parts of the period, and wait for it.
+
+        Parameters
+        ----------
+        date_start : datetime
+            Start date of the period.
+        date_end : datetime
+            End date of the period.
+        countries : List[Country], optional
+            List of countries to query, by default []
+
+        Returns
+        -------
+        bool : True if the whole period is synced, False if some parts failed to be fetched.
+        """
+        params = {"date_start": date_start.isoformat(), "date_end": date_end.isoformat()}
+        if countries:
+            params["countries"] = ",".join(Country(country).value for country in countries)
+        async with aiohttp.ClientSession() as session:
+            async with session.post(f"{self.writer}/sync", params=params) as resp:
+                if resp.status != 200:
+                    log.error(f"Writer responded with status {resp.status}")
+                    return False
+                return (await resp.json())["synced"]
+
+    async def sync_once(
+        self, date_start: datetime, date_end: datetime, countries: List[Country] = []
+    ):
+        """
+        Sync period, joining syncs that are already running for the same data.
+
+        Parts of the period covered by in-flight syncs are awaited instead of
+        being fetched again, and only the rest is synced from providers.
+
+        Parameters
+        ----------
+        date_start : datetime
+            Start date of the period.
+        date_end : datetime
+            End date of the period.
+        countries : List[Country], optional
+            List of countries to query, by default []
+        """
+        countries = tuple(sorted(countries))
+        remaining = [(date_start, date_end)]
+        tasks = []
+        for (start, end, synced), task in self.in_flight.items():
+            # in-flight sync should cover all requested countries
+            if synced and (not countries or not set(countries) <= set(synced)):
+                continue
+            parts = []
+            for part in remaining:
+                if start < part[1] and part[0] < end:
+                    parts.extend(self.subtract_range(part, (start, end)))
+                    if task not in tasks:
+                        tasks.append(task)
+                else:
+                    parts.append(part)
+            remaining = parts
+
+        for part in remaining:
+            key = (*part, countries)
+            task = asyncio.ensure_future(self.sync(*part, countries=list(countries)))
+            task.add_done_callback(lambda _, key=key: self.in_flight.pop(key, None))
+            self.in_flight[key] = task
+            tasks.append(task)
+        # shield shared syncs from cancellation of a single caller
+        await asyncio.gather(*[asyncio.shield(task) for task in tasks])
+
+    def subtract_range(
+        self, dates: Tuple[datetime, datetime], other: Tuple[datetime, datetime]
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Remove other range of dates from the range.
+
+        Parameters
+        ----------
+        dates : Tuple[datetime, datetime]
+            Range of dates to subtract from.
+        other : Tuple[datetime, datetime]
+            Range of dates to remove.
+
+        Returns
+        -------
+        List[Tuple[datetime, datetime]] : List of remaining ranges.
+        """
+        result = []
+        if dates[0] < other[0]:
+            result.append((dates[0], min(dates[1], other[0])))
+        if other[1] < dates[1]:
+            result.append((max(dates[0], other[1]), dates[1]))
+        return result
+
+    def merge_ranges(
+        self, ranges: List[Tuple[datetime, datetime]]
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Merge overlapping ranges of dates.
+
+        Parameters
+        ----------
+        ranges : List[Tuple[datetime, datetime]]
+            Ranges of dates in any order.
+
+        Returns
+        -------
+        List[Tuple[datetime, datetime]] : List of sorted non-overlapping ranges.
+        """
+        merged = []
+        for date_start, date_end in sorted(ranges):
+            if merged and date_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], date_end))
+            else:
+                merged.append((date_start, date_end))
+        return merged
+
+    async def latest(
+        self, countries: List[Country] = [], tickers: List[str] = []
+    ) -> QueryResult:
+        """
+        Get the most recent data point for every indicator.
+
+        Served from the latest values table, maintained by `update`, so the cost
+        depends on number of tickers only, not on the amount of stored data.
+
+        Parameters
+        ----------
+        countries : List[Country], optional
+            List of countries to query, by default []
+        tickers : List[str], optional
+            List of tickers to query, by default []
 
-                result = await session.execute(q)
+        Returns
+        -------
+        QueryResult: Latest data point per ticker.
+        """
+        async with self.read_session() as session:
+            async with session.begin():
+                result = await session.execute(
+                    statements.latest_statement(bool(countries), bool(tickers)),
+                    {"countries": countries, "tickers": tickers},
+                )
                 return QueryResult(
                     data=[
                         QueryResultData(
@@ -110,10 +774,18 @@ class Storage(DataProvider):
                 )
 
     async def dates_to_sync(
-        self, date_start: datetime, date_end: datetime
-    ) -> List[Tuple[datetime, datetime]]:
+        self,
+        date_start: datetime,
+        date_end: datetime,
+        countries: List[Country] = [],
+        primary: bool = False,
+    ) -> Dict[Tuple[datetime, datetime], List[Country]]:
         """
-        Calculate the dates to sync with remote providers.
+        Calculate the dates to sync with remote providers for every country.
+
+        Synced periods are tracked per country, so only countries that miss
+        data for the requested period are planned to be fetched. Countries with
+        the same missing period are grouped to share a single request.
 
         Parameters
         ----------
@@ -121,36 +793,54 @@ class Storage(DataProvider):
             Start date of the period.
         date_end : datetime
             End date of the period.
+        countries : List[Country], optional
+            List of countries to sync, by default [] (all countries)
+        primary : bool, optional
+            Read synced periods from primary storage instead of replicas, by default False
 
         Returns
         -------
-        List[Tuple[datetime, datetime]] : List of non-overlapping ranges.
+        Dict[Tuple[datetime, datetime], List[Country]] : Countries to sync per period.
         """
-        # get min and max dates from Storage
-        async with self.session() as session:
+        countries = [Country(country) for country in countries] or list(Country)
+        synced = defaultdict(list)
+        async with self.read_session(primary) as session:
             async with session.begin():
-                q = select(func.min(IndicatorData.date), func.max(IndicatorData.date)).order_by(
-                    IndicatorData.date
-                )
-                result = await session.execute(q)
-                existing_rows_dates = result.fetchone()
-                if all(existing_rows_dates):
-                    dates = self.calculate_non_overlapping_ranges(
-                        existing_rows_dates,
-                        (
-                            date_start,
-                            date_end,
-                        ),
+                result = await session.execute(statements.WATERMARKS, {"countries": countries})
+                for country, start, end in result:
+                    synced[country].append((start, end))
+
+                # storages synced before watermarks were introduced only know
+                # boundaries of stored data, so use them as a best guess
+                legacy = [country for country in countries if country not in synced]
+                if legacy:
+                    result = await session.execute(
+                        statements.DATA_BOUNDARIES, {"countries": legacy}
                     )
-                    return dates
-                else:
-                    return [(date_start, date_end)]
+                    for country, start, end in result:
+                        if start < end:
+                            synced[country].append((start, end))
+
+        plan = defaultdict(list)
+        for country in countries:
+            dates = [(date_start, date_end)]
+            for existing_dates in synced[country]:
+                dates = [
+                    missing
+                    for requested_dates in dates
+                    for missing in self.calculate_non_overlapping_ranges(
+                        existing_dates, requested_dates
+                    )
+                ]
+            for missing in dates:
+                plan[missing].append(country)
+        return dict(plan)
 
     def calculate_non_overlapping_ranges(
         self, existing_dates: Tuple[datetime, datetime], requested_dates: Tuple[datetime, datetime]
     ) -> List[Tuple[datetime, datetime]]:
         """
-        Calculate the overlap between the two ranges of dates.
+        Calculate parts of requested range of dates that are not covered by existing one.
 
         Parameters
         ----------
@@ -163,26 +853,47 @@ class Storage(DataProvider):
         -------
         List[Tuple[datetime, datetime]] : List of non-overlapping ranges.
         """
-        overlap_start = max(existing_dates[0], requested_dates[0])
-        overlap_end = min(existing_dates[1], requested_dates[1])
+        return self.subtract_range(requested_dates, existing_dates)
 
-        # Check if there is any overlap
-        if overlap_start < overlap_end:
-            # There is overlap, so return the non-overlapping ranges
-            non_overlapping_ranges = []
-            if existing_dates[0] < requested_dates[0]:
-                non_overlapping_ranges.append((existing_dates[0], overlap_start))
-            else:
-                non_overlapping_ranges.append((requested_dates[0], overlap_start))
-            if existing_dates[1] > requested_dates[1]:
-                non_overlapping_ranges.append((overlap_end, existing_dates[1]))
-            else:
-                non_overlapping_ranges.append((overlap_end, requested_dates[1]))
+    async def update_watermarks(
+        self, date_start: datetime, date_end: datetime, countries: List[Country] = []
+    ):
+        """
+        Mark period as synced for countries.
 
-            return non_overlapping_ranges
-        else:
-            # There is no overlap, so just return the original ranges
-            return [requested_dates]
+        Future is never marked as synced, since upcoming events don't have actual data yet.
+
+        Parameters
+        ----------
+        date_start : datetime
+            Start date of the period.
+        date_end : datetime
+            End date of the period.
+        countries : List[Country], optional
+            List of synced countries, by default [] (all countries)
+        """
+        countries = [Country(country) for country in countries] or list(Country)
+        date_start = naive_utc(date_start)
+        date_end = min(naive_utc(date_end), datetime.utcnow())
+        if date_end <= date_start:
+            return
+
+        # periods are read, merged and written again, so concurrent updates would race
+        async with self.write_lock, self.session() as session:
+            async with session.begin():
+                if self.engine.dialect.name == "postgresql":
+                    # lock of other processes is held until commit
+                    await session.execute(select(func.pg_advisory_xact_lock(WATERMARKS_LOCK)))
+                synced = defaultdict(list)
+                q = select(SyncWatermark).filter(SyncWatermark.country.in_(countries))
+                for watermark in (await session.execute(q)).scalars():
+                    synced[watermark.country].append((watermark.date_start, watermark.date_end))
+                    await session.delete(watermark)
+                # remove old periods first, merged ones may have the same primary key
+                await session.flush()
+                for country in countries:
+                    for start, end in self.merge_ranges(synced[country] + [(date_start, date_end)]):
+                        session.add(SyncWatermark(country=country, date_start=start, date_end=end))
 
     async def sync(
         self, date_start: datetime, date_end: datetime, countries: List[Country] = []
@@ -203,50 +914,770 @@ class Storage(DataProvider):
         -------
         List[str] : List of tickers that were updated.
         """
-        # fetch remote events
-        events = await self.fetch(date_start, date_end, countries)
-        if events:
-            indicators = await self.transform(events)
-            return await self.update(indicators, date_start, date_end)
-        return []
+        chunks = self.split_range(date_start, date_end, timedelta(days=self.chunk_days))
+        return await self.pipeline(chunks, countries, self.update)
+
+    async def pipeline(
+        self,
+        chunks: List[Tuple[datetime, datetime]],
+        countries: List[Country],
+        write: Callable[[Indicators, datetime, datetime], Awaitable[List[str]]],
+        strict: bool = False,
+        on_chunk: Optional[Callable[[datetime, datetime], Awaitable]] = None,
+    ) -> List[str]:
+        """
+        Fetch, transform and write chunks of data in overlapping stages.
+
+        Stages are connected with bounded queues, so the next chunk is downloaded
+        while the previous one is written, and the number of chunks kept in memory
+        is limited by the slowest stage.
+
+        Parameters
+        ----------
+        chunks : List[Tuple[datetime, datetime]]
+            Consecutive periods to sync.
+        countries : List[Country]
+            List of countries to sync.
+        write : Callable[[Indicators, datetime, datetime], Awaitable[List[str]]]
+            Function to write indicators of a period into storage.
+        strict : bool, optional
+            Raise error if chunk can't be fetched, instead of skipping it, by default False
+        on_chunk : Optional[Callable[[datetime, datetime], Awaitable]], optional
+            Function to call after period of a chunk is synced, by default None
+
+        Returns
+        -------
+        List[str] : List of tickers that were updated.
+        """
+        fetched = asyncio.Queue(self.queue_size)
+        transformed = asyncio.Queue(self.queue_size)
+        tickers = set()
+        tasks = [
+            asyncio.ensure_future(stage)
+            for stage in (
+                self._fetch_stage(chunks, countries, fetched, strict),
+                self._transform_stage(fetched, transformed),
+                self._write_stage(transformed, countries, write, tickers, on_chunk),
+            )
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return sorted(tickers)
+
+    async def _fetch_stage(
+        self,
+        chunks: List[Tuple[datetime, datetime]],
+        countries: List[Country],
+        target: asyncio.Queue,
+        strict: bool,
+    ):
+        for start, end in chunks:
+            events = await self.fetch(start, end, countries)
+            if events is False and strict:
+                raise ValueError(f"Failed to fetch data for {start:%d.%m.%Y} - {end:%d.%m.%Y}")
+            await target.put((start, end, events))
+        await target.put(None)
+
+    async def _transform_stage(self, source: asyncio.Queue, target: asyncio.Queue):
+        while (chunk := await source.get()) is not None:
+            start, end, events = chunk
+            indicators = await self.transform(events) if events else events
+            if indicators is False and events:
+                raise ValueError(f"Failed to transform data for {start:%d.%m.%Y} - {end:%d.%m.%Y}")
+            await target.put((start, end, indicators))
+        await target.put(None)
+
+    async def _write_stage(
+        self,
+        source: asyncio.Queue,
+        countries: List[Country],
+        write: Callable[[Indicators, datetime, datetime], Awaitable[List[str]]],
+        tickers: Set[str],
+        on_chunk: Optional[Callable[[datetime, datetime], Awaitable]],
+    ):
+        while (chunk := await source.get()) is not None:
+            start, end, indicators = chunk
+            if indicators:
+                # serialize writes to avoid races on the same rows
+                async with self.write_lock:
+                    tickers.update(await write(indicators, start, end))
+            # chunks that failed to be fetched are not marked as synced
+            if indicators is not False:
+                await self.update_watermarks(start, end, countries)
+                if on_chunk:
+                    await on_chunk(start, end)
+
+    async def watch(
+        self, countries: List[Country] = [], tickers: List[str] = []
+    ) -> AsyncIterator[List[DataChange]]:
+        """
+        Subscribe to data points inserted or changed in storage.
+
+        Parameters
+        ----------
+        countries : List[Country], optional
+            List of countries to watch, by default [] (all countries)
+        tickers : List[str], optional
+            List of tickers to watch, by default [] (all tickers)
+
+        Yields
+        ------
+        List[DataChange] : Batch of changes, available at the moment.
+        """
+        async with self.bus.subscribe() as queue:
+            while True:
+                changes = [await queue.get()]
+                while not queue.empty():
+                    changes.append(queue.get_nowait())
+                changes = [
+                    change
+                    for change in changes
+                    if (not countries or change.country in countries)
+                    and (not tickers or change.ticker in tickers)
+                ]
+                if changes:
+                    yield changes
+
+    async def poll(
+        self,
+        countries: List[Country] = [],
+        interval: int = 60,
+        max_interval: int = 3600,
+        lookback: timedelta = timedelta(days=1),
+    ):
+        """
+        Periodically sync recent period to pick up newly released data.
+
+        Provider is polled every `interval` seconds only around scheduled releases,
+        otherwise polling backs off up to `max_interval` seconds.
+
+        Parameters
+        ----------
+        countries : List[Country], optional
+            List of countries to sync, by default [] (all countries)
+        interval : int, optional
+            Number of seconds between syncs around releases, by default 60
+        max_interval : int, optional
+            Maximum number of seconds between syncs, by default 3600
+        lookback : timedelta, optional
+            Length of recent and upcoming period to sync, by default 1 day
+        """
+        while True:
+            now = datetime.utcnow()
+            try:
+                # upcoming period is synced as well to keep release calendar up to date
+                await self.sync_once(now - lookback, now + lookback, countries)
+            except Exception as error:
+                log.error("Failed to sync recent data: {}".format(str(error)))
+            await asyncio.sleep(await self.poll_interval(countries, interval, max_interval))
+
+    async def poll_interval(
+        self,
+        countries: List[Country] = [],
+        interval: int = 60,
+        max_interval: int = 3600,
+        window: timedelta = timedelta(minutes=5),
+    ) -> float:
+        """
+        Calculate number of seconds to wait before the next sync with provider.
+
+        Parameters
+        ----------
+        countries : List[Country], optional
+            List of countries to sync, by default [] (all countries)
+        interval : int, optional
+            Number of seconds between syncs around releases, by default 60
+        max_interval : int, optional
+            Maximum number of seconds between syncs, by default 3600
+        window : timedelta, optional
+            Period around scheduled release to poll aggressively, by default 5 minutes
+
+        Returns
+        -------
+        float : Number of seconds to wait.
+        """
+        now = datetime.utcnow()
+        async with self.session() as session:
+            async with session.begin():
+                q = select(func.min(ScheduledRelease.date)).filter(
+                    ScheduledRelease.date >= now - window
+                )
+                if countries:
+                    q = q.filter(ScheduledRelease.country.in_(countries))
+                next_release = (await session.execute(q)).scalar()
+
+        if next_release is None:
+            return max_interval
+        wait = (next_release - window - now).total_seconds()
+        return min(max(wait, interval), max_interval)
+
+    async def backfill(
+        self,
+        date_start: datetime,
+        date_end: datetime,
+        countries: List[Country] = [],
+        chunk_days: int = 30,
+        resume: bool = False,
+    ) -> List[str]:
+        """
+        Load long history of data from remote providers.
+
+        Period is split into chunks that are fetched, transformed and written
+        in a pipeline. On Postgres, data is loaded with `COPY` instead of ORM objects.
+        Progress is recorded in a job journal, so an interrupted backfill of the same
+        period only loads chunks that were not finished.
+
+        Parameters
+        ----------
+        date_start : datetime
+            Start date of the period.
+        date_end : datetime
+            End date of the period.
+        countries : List[Country], optional
+            List of countries to load, by default []
+        chunk_days : int, optional
+            Number of days to fetch from provider at once, by default 30
+        resume : bool, optional
+            Resume the last unfinished backfill, ignoring other arguments, by default False
+
+        Returns
+        -------
+        List[str] : List of tickers that were updated.
+        """
+        job, chunks, total = await self.start_job(
+            date_start, date_end, countries, chunk_days, resume
+        )
+        if job is None:
+            log.info("There is no unfinished backfill to resume")
+            return []
+        countries = [Country(country) for country in job.countries.split(",") if country]
+        log.info(f"Backfill {len(chunks)} of {total} chunks")
+
+        started = time.monotonic()
+        completed = 0
+
+        async def finish(start: datetime, end: datetime):
+            nonlocal completed
+            await self.finish_chunk(job.id, start)
+            completed += 1
+            eta = (time.monotonic() - started) / completed * (len(chunks) - completed)
+            log.info(
+                f"Backfill {total - len(chunks) + completed} of {total} chunks done, "
+                f"ETA {timedelta(seconds=round(eta))}"
+            )
+
+        write = self.update
+        if self.engine.dialect.name == "postgresql":
+            write = lambda indicators, *_: self.bulk_update(indicators)  # noqa: E731
+        return await self.pipeline(chunks, countries, write, strict=True, on_chunk=finish)
+
+    async def start_job(
+        self,
+        date_start: datetime,
+        date_end: datetime,
+        countries: List[Country] = [],
+        chunk_days: int = 30,
+        resume: bool = False,
+    ) -> Tuple[Optional[SyncJob], List[Tuple[datetime, datetime]], int]:
+        """
+        Find unfinished sync job of the period, or create a new one.
+
+        Parameters
+        ----------
+        date_start : datetime
+            Start date of the period.
+        date_end : datetime
+            End date of the period.
+        countries : List[Country], optional
+            List of countries to sync, by default []
+        chunk_days : int, optional
+            Number of days in a chunk of a new job, by default 30
+        resume : bool, optional
+            Find the last unfinished job of any period, by default False
+
+        Returns
+        -------
+        Optional[SyncJob] : Sync job, or None if there is nothing to resume.
+        List[Tuple[datetime, datetime]] : Unfinished chunks of the job.
+        int : Total number of chunks in the job.
+        """
+        key = ",".join(sorted(Country(country).value for country in countries))
+        async with self.session() as session:
+            async with session.begin():
+                q = (
+                    select(SyncJob)
+                    .join(SyncJobChunk)
+                    .filter(SyncJobChunk.status != JobStatus.DONE)
+                    .order_by(SyncJob.id.desc())
+                    .limit(1)
+                )
+                if not resume:
+                    q = q.filter(
+                        SyncJob.date_start == date_start,
+                        SyncJob.date_end == date_end,
+                        SyncJob.countries == key,
+                    )
+                job = (await session.execute(q)).scalar()
+                if job is None and resume:
+                    return None, [], 0
+                if job is None:
+                    job = SyncJob(date_start=date_start, date_end=date_end, countries=key)
+                    job.chunks = [
+                        SyncJobChunk(date_start=start, date_end=end, status=JobStatus.PENDING)
+                        for start, end in self.split_range(
+                            date_start, date_end, timedelta(days=chunk_days)
+                        )
+                    ]
+                    session.add(job)
+                    await session.flush()
+
+                q = (
+                    select(SyncJobChunk.date_start, SyncJobChunk.date_end, SyncJobChunk.status)
+                    .filter(SyncJobChunk.job_id == job.id)
+                    .order_by(SyncJobChunk.date_start)
+                )
+                chunks = (await session.execute(q)).all()
+                pending = [
+                    (start, end) for start, end, status in chunks if status != JobStatus.DONE
+                ]
+                return job, pending, len(chunks)
+
+    async def finish_chunk(self, job_id: int, date_start: datetime):
+        """Mark chunk of sync job as done."""
+        async with self.session() as session:
+            async with session.begin():
+                await session.execute(
+                    update(SyncJobChunk)
+                    .filter(SyncJobChunk.job_id == job_id, SyncJobChunk.date_start == date_start)
+                    .values(status=JobStatus.DONE)
+                )
+
+    def split_range(
+        self, date_start: datetime, date_end: datetime, step: timedelta
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Split range of dates into consecutive chunks.
+
+        Parameters
+        ----------
+        date_start : datetime
+            Start date of the period.
+        date_end : datetime
+            End date of the period.
+        step : timedelta
+            Maximum length of a chunk.
+
+        Returns
+        -------
+        List[Tuple[datetime, datetime]] : List of chunks.
+        """
+        chunks = []
+        while date_start < date_end:
+            chunks.append((date_start, min(date_start + step, date_end)))
+            date_start = chunks[-1][1]
+        return chunks
+
+    async def bulk_update(self, indicators: Indicators) -> List[str]:
+        """Update Postgres storage with new indicators using `COPY`.
+
+        Data is copied into a temporary staging table and then merged
+        into indicator data with a single `INSERT ... ON CONFLICT` statement.
+        Inserted and changed data points are published to subscribers, as by `update`.
+
+        Returns a list of tickers that were created or modified.
+        """
+        tickers = list(indicators.meta.keys())
+        countries = {ticker: meta.country for ticker, meta in indicators.meta.items()}
+        newest = self.newest_data(indicators)
+        released = list(indicators.data.keys())
+        changes = []
+        async with self.session() as session:
+            async with session.begin():
+                if tickers:
+                    q = postgresql.insert(Indicator).values(
+                        [
+                            {
+                                column: getattr(meta, column)
+                                for column in BULK_INDICATOR_COLUMNS
+                            }
+                            for meta in indicators.meta.values()
+                        ]
+                    )
+                    await session.execute(
+                        q.on_conflict_do_update(
+                            index_elements=[Indicator.ticker],
+                            set_={
+                                column: q.excluded[column]
+                                for column in BULK_INDICATOR_COLUMNS
+                                if column != "ticker"
+                            },
+                        )
+                    )
+                    changes = await self.copy_data(session, indicators.data)
+                    await self.update_latest(session, newest)
+                await self.update_schedule(session, indicators.schedule, released)
+        if self.cache is not None and tickers:
+            self.cache.bump()
+        self.publish_changes(changes, countries)
+        return tickers
+
+    async def copy_data(
+        self, session: AsyncSession, data: Dict[Tuple[str, datetime], DataPoint]
+    ) -> List[DataPoint]:
+        """
+        Merge data points into Postgres storage through a staging table, skipping unchanged ones.
+
+        Returns a list of inserted and updated data points.
+        """
+        # asyncpg connection behind the session shares the same transaction
+        connection = await (await session.connection()).get_raw_connection()
+        driver = connection.driver_connection
+        await driver.execute(
+            "CREATE TEMPORARY TABLE indicator_data_staging "
+            "(LIKE indicator_data INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        await driver.copy_records_to_table(
+            "indicator_data_staging",
+            records=[
+                (ticker, date, point.actual, point.forecast)
+                for (ticker, date), point in data.items()
+            ],
+            columns=["ticker", "date", "actual", "forecast"],
+        )
+        # only inserted and changed rows are returned, xmax is zero for inserted ones
+        rows = await driver.fetch(
+            "INSERT INTO indicator_data (ticker, date, actual, forecast) "
+            "SELECT ticker, date, actual, forecast FROM indicator_data_staging "
+            "ON CONFLICT (ticker, date) DO UPDATE "
+            "SET actual = EXCLUDED.actual, forecast = EXCLUDED.forecast "
+            "WHERE (indicator_data.actual, indicator_data.forecast) "
+            "IS DISTINCT FROM (EXCLUDED.actual, EXCLUDED.forecast) "
+            "RETURNING ticker, date, actual, forecast, xmax = 0 AS inserted"
+        )
+        inserted = sum(1 for row in rows if row["inserted"])
+        updated = len(rows) - inserted
+        unchanged = len(data) - len(rows)
+        self.write_stats.update(inserted=inserted, updated=updated, unchanged=unchanged)
+        log.info(f"Data points inserted: {inserted}, updated: {updated}, unchanged: {unchanged}")
+        return [
+            DataPoint(row["ticker"], row["date"], row["actual"], row["forecast"]) for row in rows
+        ]
+
+    async def compact(
+        self,
+        retention: Dict[str, int] = {},
+        retention_days: Optional[int] = None,
+        archive: Optional[str] = None,
+        vacuum: bool = True,
+    ) -> int:
+        """
+        Remove data points older than retention period and reclaim disk space.
+
+        Retention of a ticker takes precedence over retention of its country,
+        which takes precedence over the default one.
+
+        Parameters
+        ----------
+        retention : Dict[str, int], optional
+            Number of days to keep data for, per country or ticker, by default {}
+        retention_days : Optional[int], optional
+            Number of days to keep data for other indicators, by default None (forever)
+        archive : Optional[str], optional
+            Path of gzip compressed JSON Lines file to append removed data to, by default None
+        vacuum : bool, optional
+            Reclaim disk space after removing data, by default True
+
+        Returns
+        -------
+        int : Number of removed data points.
+        """
+        condition = self.retention_condition(retention, retention_days)
+        if condition is None:
+            return 0
+
+        async with self.session() as session:
+            async with session.begin():
+                if archive:
+                    await self.archive(session, condition, archive)
+                tickers = await session.scalars(
+                    select(IndicatorData.ticker).where(condition).distinct()
+                )
+                tickers = tickers.all()
+                result = await session.execute(delete(IndicatorData).where(condition))
+                # latest value of a ticker may be removed, so it falls back to the newest one left
+                await session.execute(
+                    delete(LatestIndicatorValue).where(LatestIndicatorValue.ticker.in_(tickers))
+                )
+                await session.execute(self._rebuild_latest_query(tickers))
+        log.info(f"Removed {result.rowcount} data points")
+        if self.cache is not None and result.rowcount:
+            self.cache.bump()
+
+        if vacuum:
+            async with self.engine.connect() as conn:
+                # vacuum can't run inside of a transaction
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                if self.engine.dialect.name == "postgresql":
+                    await conn.execute(text("VACUUM ANALYZE indicator_data"))
+                else:
+                    await conn.execute(text("VACUUM"))
+        return result.rowcount
+
+    def retention_condition(
+        self, retention: Dict[str, int], retention_days: Optional[int] = None
+    ) -> Optional[ColumnElement[bool]]:
+        """Build condition matching data points older than retention period."""
+        now = datetime.utcnow()
+        countries = {
+            Country(key): days for key, days in retention.items() if key in Country.__members__
+        }
+        tickers = {key: days for key, days in retention.items() if key not in countries}
+
+        conditions = [
+            and_(IndicatorData.ticker == ticker, IndicatorData.date < now - timedelta(days=days))
+            for ticker, days in tickers.items()
+        ]
+        for country, days in countries.items():
+            conditions.append(
+                and_(
+                    IndicatorData.ticker.in_(
+                        select(Indicator.ticker).filter(
+                            Indicator.country == country, Indicator.ticker.not_in(tickers)
+                        )
+                    ),
+                    IndicatorData.date < now - timedelta(days=days),
+                )
+            )
+        if retention_days:
+            conditions.append(
+                and_(
+                    IndicatorData.ticker.in_(
+                        select(Indicator.ticker).filter(
+                            Indicator.country.not_in(countries), Indicator.ticker.not_in(tickers)
+                        )
+                    ),
+                    IndicatorData.date < now - timedelta(days=retention_days),
+                )
+            )
+        return or_(*conditions) if conditions else None
+
+    async def archive(self, session: AsyncSession, condition: ColumnElement[bool], path: str):
+        """Append data points matching condition to gzip compressed JSON Lines file."""
+        q = (
+            select(
+                IndicatorData.ticker,
+                IndicatorData.date,
+                IndicatorData.actual,
+                IndicatorData.forecast,
+            )
+            .where(condition)
+            .order_by(IndicatorData.ticker, IndicatorData.date)
+        )
+        result = await session.stream(q)
+        with gzip.open(path, "at") as file:
+            async for ticker, date, actual, forecast in result:
+                file.write(
+                    json.dumps(
+                        {
+                            "ticker": ticker,
+                            "date": date.isoformat(),
+                            "actual": actual,
+                            "forecast": forecast,
+                        }
+                    )
+                    + "\n"
+                )
 
     async def update(
         self, indicators: Indicators, date_start: datetime, date_end: datetime
     ) -> List[str]:
         """Update data storage with new indicators.
 
+        Only rows with changed values are written, so re-sync of the same period
+        is nearly write-free. Number of inserted, updated and unchanged data points
+        is added to `write_stats`.
+
         Returns a list of tickers that were created or modified.
         """
         tickers = list(indicators.meta.keys())
+        countries = {ticker: meta.country for ticker, meta in indicators.meta.items()}
+        # find the newest data point of every ticker before rows are consumed below
+        newest = self.newest_data(indicators)
+        released = list(indicators.data.keys())
+        changed, changes = False, []
         async with self.session() as session:
             async with session.begin():
                 if tickers:
-                    # First, sync meta data
-                    q = select(Indicator.ticker).filter(Indicator.ticker.in_(tickers))
-                    for ind in await session.execute(q):
-                        # copy original tickers to a separate list to use them in data query
-                        if ind[0] in indicators.meta:
-                            # update meta data for existing tickers
-                            await session.merge(indicators.meta.pop(ind[0]))
-                    session.add_all(indicators.meta.values())
-
-                    # Pull range of data for existing tickers and update with new values
-                    q = select(IndicatorData.ticker, IndicatorData.date).filter(
-                        IndicatorData.ticker.in_(tickers),
-                        IndicatorData.date.between(date_start, date_end),
+                    changed = await self.update_meta(session, indicators.meta)
+                    changes = await self.update_data(
+                        session, indicators.data, tickers, date_start, date_end
                     )
-                    for index in await session.execute(q):
-                        # update existing data rows
-                        if index in indicators.data.keys():
-                            await session.merge(indicators.data.pop(index))
-                    # add new data
-                    session.add_all([data for data in indicators.data.values()])
+                    await self.update_latest(session, newest)
+                await self.update_schedule(session, indicators.schedule, released)
+        if self.cache is not None and (changed or changes):
+            self.cache.bump()
+        self.publish_changes(changes, countries)
         return tickers
 
+    async def update_meta(self, session: AsyncSession, meta: Dict[str, Indicator]) -> bool:
+        """
+        Insert new indicators and update those with changed meta data.
+
+        Returns True if any indicator was inserted or updated.
+        """
+        result = await session.execute(statements.EXISTING_TICKERS, {"tickers": list(meta)})
+        changed = []
+        for row in result:
+            indicator = meta.pop(row.ticker, None)
+            if indicator is not None and any(
+                getattr(indicator, column) != value for column, value in row._mapping.items()
+            ):
+                changed.append({column: getattr(indicator, column) for column in row._fields})
+        if changed:
+            await session.execute(update(Indicator), changed)
+        session.add_all(meta.values())
+        return bool(changed or meta)
+
+    async def update_data(
+        self,
+        session: AsyncSession,
+        data: Dict[Tuple[str, datetime], DataPoint],
+        tickers: List[str],
+        date_start: datetime,
+        date_end: datetime,
+    ) -> List[DataPoint]:
+        """
+        Insert new data points and update those with changed values.
+
+        Returns a list of inserted and updated data points.
+        """
+        result = await session.execute(
+            statements.EXISTING_DATA,
+            {"tickers": tickers, "date_start": date_start, "date_end": date_end},
+        )
+        changes = []
+        unchanged = 0
+        for ticker, date, actual, forecast in result:
+            point = data.pop((ticker, date), None)
+            if point is None:
+                continue
+            if (point.actual, point.forecast) == (actual, forecast):
+                unchanged += 1
+            else:
+                changes.append(point)
+        if changes:
+            await session.execute(
+                update(IndicatorData),
+                [
+                    {
+                        "ticker": point.ticker,
+                        "date": point.date,
+                        "actual": point.actual,
+                        "forecast": point.forecast,
+                    }
+                    for point in changes
+                ],
+            )
+        session.add_all([point.to_model() for point in data.values()])
+
+        self.write_stats.update(inserted=len(data), updated=len(changes), unchanged=unchanged)
+        log.info(
+            f"Data points inserted: {len(data)}, updated: {len(changes)}, unchanged: {unchanged}"
+        )
+        return changes + list(data.values())
+
+    async def update_schedule(
+        self,
+        session: AsyncSession,
+        schedule: Dict[Tuple[str, datetime], ScheduledRelease],
+        released: List[Tuple[str, datetime]],
+    ):
+        """Store upcoming releases and remove those that have been released."""
+        if schedule:
+            tickers, dates = zip(*schedule)
+            result = await session.execute(
+                statements.EXISTING_RELEASES,
+                {"tickers": list(set(tickers)), "date_start": min(dates), "date_end": max(dates)},
+            )
+            changed = []
+            for ticker, date, country in result:
+                release = schedule.pop((ticker, date), None)
+                if release is not None and release.country != country:
+                    changed.append({"ticker": ticker, "date": date, "country": release.country})
+            if changed:
+                await session.execute(update(ScheduledRelease), changed)
+            session.add_all(schedule.values())
+        if released:
+            await session.execute(
+                delete(ScheduledRelease).filter(
+                    tuple_(ScheduledRelease.ticker, ScheduledRelease.date).in_(released)
+                )
+            )
+
+    def publish_changes(self, changes: List[DataPoint], countries: Dict[str, Country]):
+        """Notify subscribers about inserted or changed data points."""
+        self.bus.publish(
+            [
+                DataChange(
+                    ticker=data.ticker,
+                    country=countries[data.ticker],
+                    date=data.date.replace(tzinfo=None),
+                    actual=data.actual,
+                    forecast=data.forecast,
+                )
+                for data in changes
+            ]
+        )
+
+    def newest_data(self, indicators: Indicators) -> Dict[str, Tuple[datetime, DataPoint]]:
+        """Find the newest data point of every ticker in indicators."""
+        newest = {}
+        for (ticker, date), data in indicators.data.items():
+            if ticker not in newest or newest[ticker][0] < date:
+                newest[ticker] = (date, data)
+        return newest
+
+    async def update_latest(
+        self, session: AsyncSession, newest: Dict[str, Tuple[datetime, DataPoint]]
+    ):
+        """Keep latest values in sync, replacing only older data points."""
+        result = await session.execute(statements.LATEST_DATES, {"tickers": list(newest)})
+        changed = []
+        for ticker, date, actual, forecast in result:
+            newest_date, data = newest.pop(ticker)
+            # keep newer values, and skip writing the same ones again
+            unchanged = (newest_date, data.actual, data.forecast) == (date, actual, forecast)
+            if newest_date >= date and not unchanged:
+                changed.append(
+                    {
+                        "ticker": ticker,
+                        "date": newest_date,
+                        "actual": data.actual,
+                        "forecast": data.forecast,
+                    }
+                )
+        if changed:
+            await session.execute(update(LatestIndicatorValue), changed)
+        session.add_all(
+            [
+                LatestIndicatorValue(
+                    ticker=data.ticker,
+                    date=date,
+                    actual=data.actual,
+                    forecast=data.forecast,
+                )
+                for date, data in newest.values()
+            ]
+        )
+
     async def transform(self, events: List[Event]) -> Indicators:
         """Transform events into indicators.
 
-        Remove events without actual data and then transform into two objects:
+        Events without actual data are kept as scheduled releases, and others are
+        transformed into two objects:
             - Indicator: meta data about particular indicator (always unique)
             - IndicatorData: forecast and actual data for particular date (not unique)
 
@@ -259,31 +1690,246 @@ class Storage(DataProvider):
         -------
         Dict[str, Indicator]: meta data about Indicators
         Dict[Tuple[str, datetime], IndicatorData]: forecast and actual data for particular date
+        Dict[Tuple[str, datetime], ScheduledRelease]: upcoming releases
         """
-        result = {"meta": {}, "data": defaultdict(IndicatorData)}
-        for event in events:
-            if event.actual:
-                try:
-                    result["meta"][event.ticker] = Indicator(
-                        **event.model_dump(
-                            exclude_unset=True, exclude={"actual", "forecast", "date"}
-                        )
-                    )
-                    # We use a combination of ticker and date as a primary key while comparing
-                    # with already stored data. However, sqlalchemy returns datetime without tzinfo,
-                    # so we need to remove it from pydantic model as well.
-                    index = (
-                        event.ticker,
-                        event.date.replace(tzinfo=None),
-                    )
-                    result["data"][index] = IndicatorData(
-                        ticker=event.ticker,
-                        date=event.date,
-                        actual=event.actual,
-                        forecast=event.forecast,
-                    )
-                except Exception as error:
-                    log.error("Failed to transform data into indicator {}".format(str(error)))
-                    return False
+        try:
+            batches = await run_batches(self.executor, transform_events, events, self.batch_size)
+        except Exception as error:
+            log.error("Failed to transform data into indicator {}".format(str(error)))
+            return False
 
+        result = {"meta": {}, "data": {}, "schedule": {}}
+        for batch in batches:
+            for key, value in batch.items():
+                result[key].update(value)
         return Indicators(**result)
+
+
+class ShardedStorage(Storage):
+    """Storage split between multiple databases by country.
+
+    Countries without a shard are kept in the default storage, which is also used
+    for everything that is not related to particular countries. Methods of `Storage`
+    are called explicitly on shards, so the default one runs the original implementation.
+    """
+
+    def __init__(
+        self,
+        dsn: PostgresDsn | SQLiteDsn,
+        shards: Dict[Country, PostgresDsn | SQLiteDsn],
+        replicas: List[PostgresDsn | SQLiteDsn] = [],
+        **options,
+    ):
+        super().__init__(dsn, replicas=replicas, **options)
+        storages = {}
+        self.shards: Dict[Country, Storage] = {}
+        for country, shard in shards.items():
+            if str(shard) not in storages:
+                storages[str(shard)] = Storage(shard, **options)
+                # changes from all shards are delivered to the same subscribers
+                storages[str(shard)].bus = self.bus
+                storages[str(shard)].write_stats = self.write_stats
+            self.shards[Country(country)] = storages[str(shard)]
+
+    def split(self, countries: List[Country] = []) -> Dict[Storage, List[Country]]:
+        """Group countries by storage they are kept in."""
+        result = defaultdict(list)
+        for country in [Country(country) for country in countries] or list(Country):
+            result[self.shards.get(country, self)].append(country)
+        return dict(result)
+
+    def split_indicators(self, indicators: Indicators) -> Dict[Storage, Indicators]:
+        """Group indicators by storage they are kept in."""
+        parts = defaultdict(lambda: {"meta": {}, "data": {}, "schedule": {}})
+        storages = {}
+        for ticker, meta in indicators.meta.items():
+            storages[ticker] = self.shards.get(Country(meta.country), self)
+            parts[storages[ticker]]["meta"][ticker] = meta
+        for index, data in indicators.data.items():
+            parts[storages[index[0]]]["data"][index] = data
+        for index, release in indicators.schedule.items():
+            parts[self.shards.get(Country(release.country), self)]["schedule"][index] = release
+        return {storage: Indicators(**part) for storage, part in parts.items()}
+
+    async def connect(self):
+        storages = {self, *self.shards.values()}
+        await asyncio.gather(*[Storage.connect(storage) for storage in storages])
+
+    async def list(self, countries: List[Country] = [], search: Optional[str] = None) -> ListResult:
+        results = await asyncio.gather(
+            *[
+                Storage.list(storage, shard, search)
+                for storage, shard in self.split(countries).items()
+            ]
+        )
+        return ListResult(data=[row for result in results for row in result.data])
+
+    async def query_rows(
+        self,
+        date_start: datetime,
+        date_end: datetime,
+        countries: List[Country] = [],
+        tickers: List[str] = [],
+        no_sync: bool = False,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Tuple[str, datetime, float, Optional[float]]], Optional[str]]:
+        results = await asyncio.gather(
+            *[
+                Storage.query_rows(
+                    storage, date_start, date_end, shard, tickers, no_sync, limit, cursor
+                )
+                for storage, shard in self.split(countries).items()
+            ]
+        )
+        # every shard returns data ordered by date, so they are merged keeping the order
+        key = (lambda r: (r.date, r.ticker)) if limit else (lambda r: r.date)
+        rows = list(heapq.merge(*[rows for rows, _ in results], key=key))
+        # pages of shards are cut to the limit, so any of them may have more data
+        return self.paginate(rows, limit, more=any(cursor for _, cursor in results))
+
+    async def query_many(
+        self,
+        specs: List[Tuple[List[str], List[Country], datetime, datetime]],
+        no_sync: bool = False,
+    ) -> List[QueryResult]:
+        return await asyncio.gather(
+            *[
+                self.query(date_start, date_end, countries, tickers, no_sync)
+                for tickers, countries, date_start, date_end in specs
+            ]
+        )
+
+    async def latest(
+        self, countries: List[Country] = [], tickers: List[str] = []
+    ) -> QueryResult:
+        results = await asyncio.gather(
+            *[
+                Storage.latest(storage, shard, tickers)
+                for storage, shard in self.split(countries).items()
+            ]
+        )
+        return QueryResult(
+            data=list(
+                heapq.merge(*[result.data for result in results], key=lambda r: r.ticker)
+            )
+        )
+
+    async def dates_to_sync(
+        self,
+        date_start: datetime,
+        date_end: datetime,
+        countries: List[Country] = [],
+        primary: bool = False,
+    ) -> Dict[Tuple[datetime, datetime], List[Country]]:
+        plans = await asyncio.gather(
+            *[
+                Storage.dates_to_sync(storage, date_start, date_end, shard, primary)
+                for storage, shard in self.split(countries).items()
+            ]
+        )
+        result = defaultdict(list)
+        for plan in plans:
+            for dates, shard in plan.items():
+                result[dates].extend(shard)
+        return dict(result)
+
+    async def update_watermarks(
+        self, date_start: datetime, date_end: datetime, countries: List[Country] = []
+    ):
+        await asyncio.gather(
+            *[
+                Storage.update_watermarks(storage, date_start, date_end, shard)
+                for storage, shard in self.split(countries).items()
+            ]
+        )
+
+    async def update(
+        self, indicators: Indicators, date_start: datetime, date_end: datetime
+    ) -> List[str]:
+        results = await asyncio.gather(
+            *[
+                Storage.update(storage, part, date_start, date_end)
+                for storage, part in self.split_indicators(indicators).items()
+            ]
+        )
+        return [ticker for tickers in results for ticker in tickers]
+
+    async def backfill(
+        self,
+        date_start: datetime,
+        date_end: datetime,
+        countries: List[Country] = [],
+        chunk_days: int = 30,
+        resume: bool = False,
+    ) -> List[str]:
+        if resume:
+            # every shard keeps its own journal, and resumes its own unfinished job
+            storages = {storage: [] for storage in {self, *self.shards.values()}}
+        else:
+            storages = self.split(countries)
+        results = await asyncio.gather(
+            *[
+                Storage.backfill(storage, date_start, date_end, shard, chunk_days, resume)
+                for storage, shard in storages.items()
+            ]
+        )
+        return sorted(ticker for tickers in results for ticker in tickers)
+
+    async def compact(
+        self,
+        retention: Dict[str, int] = {},
+        retention_days: Optional[int] = None,
+        archive: Optional[str] = None,
+        vacuum: bool = True,
+    ) -> int:
+        storages = {self, *self.shards.values()}
+        # shards are compacted one by one, as they may append to the same archive
+        removed = 0
+        for storage in storages:
+            removed += await Storage.compact(storage, retention, retention_days, archive, vacuum)
+        return removed
+
+    async def poll_interval(
+        self,
+        countries: List[Country] = [],
+        interval: int = 60,
+        max_interval: int = 3600,
+        window: timedelta = timedelta(minutes=5),
+    ) -> float:
+        intervals = await asyncio.gather(
+            *[
+                Storage.poll_interval(storage, shard, interval, max_interval, window)
+                for storage, shard in self.split(countries).items()
+            ]
+        )
+        return min(intervals)
+
+
+def transform_events(events: List[Event]) -> Dict[str, Dict]:
+    """Transform events into indicators, data points and scheduled releases."""
+    result = {"meta": {}, "data": {}, "schedule": {}}
+    for event in events:
+        # We use a combination of ticker and date as a primary key while comparing
+        # with already stored data. However, sqlalchemy returns datetime without tzinfo,
+        # so we need to remove it from pydantic model as well.
+        index = (
+            sys.intern(event.ticker),
+            event.date.replace(tzinfo=None),
+        )
+        if event.actual:
+            result["meta"][event.ticker] = Indicator(
+                **event.model_dump(exclude_unset=True, exclude={"actual", "forecast", "date"})
+            )
+            # the same ticker and date objects are shared by all data points and their keys
+            result["data"][index] = DataPoint(
+                ticker=index[0],
+                date=index[1],
+                actual=event.actual,
+                forecast=event.forecast,
+            )
+        elif event.actual is None:
+            result["schedule"][index] = ScheduledRelease(
+                ticker=event.ticker, date=index[1], country=event.country
+            )
+    return result
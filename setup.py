@@ -8,6 +8,8 @@ setup(
     packages=find_packages(),
     install_requires=["aiohttp", "pydantic>=2.0.0", "sqlalchemy[asyncio]", "aiosqlite"],
     extras_require={
+        "postgres": ["asyncpg"],
+        "orjson": ["orjson"],
         "dev": [
             "setuptools>65.5.0",
             "flake8",
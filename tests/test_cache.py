@@ -0,0 +1,117 @@
+import re
+from datetime import datetime, timezone
+
+import pytest
+from aioresponses import aioresponses
+from sqlalchemy import delete
+
+from ecst.cache import ResultCache
+from ecst.models import IndicatorData
+from ecst.storages import Storage
+
+from .test_storages import sample_event
+
+
+def test_cache_generations(tmp_path):
+    """values should be shared between instances until the next generation"""
+    cache = ResultCache(str(tmp_path / "cache.db"))
+    cache.put("key", [1, 2], cache.generation())
+    cache.put("persistent", True)
+    other = ResultCache(str(tmp_path / "cache.db"))
+    assert other.get("key") == [1, 2]
+
+    generation = cache.generation()
+    other.bump()
+    assert cache.get("key") is None
+    assert cache.get("persistent") is True
+    # value computed from the previous generation is never cached
+    cache.put("key", [1], generation)
+    assert other.get("key") is None
+
+
+def test_cache_eviction(tmp_path):
+    """least recently used values should be evicted to fit into maximum size"""
+    cache = ResultCache(str(tmp_path / "cache.db"), max_size=200, memory_size=1)
+    for key in ["a", "b", "c"]:
+        cache.put(key, "x" * 80, cache.generation())
+        cache.get("a")
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+@pytest.mark.asyncio()
+async def test_storage_cache(tmp_path):
+    """query results should be shared between processes until storage is updated"""
+    dsn = f"sqlite+aiosqlite:///{tmp_path / 'storage.db'}"
+    storage = Storage(dsn, cache=ResultCache(str(tmp_path / "cache.db")))
+    await storage.connect()
+    with aioresponses() as m:
+        pattern = re.compile(r"^https://economic-calendar\.tradingview\.com/events\?.*")
+        m.get(pattern, payload={"status": "ok", "result": [sample_event]}, repeat=True)
+        result = await storage.query(datetime(2023, 7, 24), datetime(2023, 7, 28))
+        assert len(result.data) == 1
+        # dates with timezone are read from the same cached result
+        result = await storage.query(
+            datetime(2023, 7, 24, tzinfo=timezone.utc), datetime(2023, 7, 28, tzinfo=timezone.utc)
+        )
+        assert len(result.data) == 1
+
+        # data is removed behind the back of cache
+        async with storage.session() as session:
+            async with session.begin():
+                await session.execute(delete(IndicatorData))
+
+        other = Storage(dsn, cache=ResultCache(str(tmp_path / "cache.db")))
+        await other.connect()
+        assert other.search_index
+        result = await other.query(datetime(2023, 7, 24), datetime(2023, 7, 28))
+        assert len(result.data) == 1
+        assert len(m.requests) == 1
+
+        # sync writes data again, invalidating cache
+        await storage.sync(datetime(2023, 7, 24), datetime(2023, 7, 28))
+        result = await other.query(datetime(2023, 7, 24), datetime(2023, 7, 28), no_sync=True)
+        assert len(result.data) == 1
+        assert (await other.list(search="core")).data[0].ticker == "AUCIR"
+
+
+@pytest.mark.asyncio()
+async def test_storage_cache_failed_sync(tmp_path):
+    """results of periods that failed to be synced should not be cached"""
+    dsn = f"sqlite+aiosqlite:///{tmp_path / 'storage.db'}"
+    storage = Storage(dsn, cache=ResultCache(str(tmp_path / "cache.db")))
+    await storage.connect()
+    with aioresponses() as m:
+        pattern = re.compile(r"^https://economic-calendar\.tradingview\.com/events\?.*")
+        m.get(pattern, status=500)
+        m.get(pattern, payload={"status": "ok", "result": [sample_event]})
+        result = await storage.query(datetime(2023, 7, 24), datetime(2023, 7, 28))
+        assert not result.data
+        result = await storage.query(datetime(2023, 7, 24), datetime(2023, 7, 28))
+        assert len(result.data) == 1
+
+
+@pytest.mark.asyncio()
+async def test_storage_cache_recreated_database(tmp_path):
+    """schema should be created again, if database was removed after it was cached"""
+    dsn = f"sqlite+aiosqlite:///{tmp_path / 'storage.db'}"
+    storage = Storage(dsn, cache=ResultCache(str(tmp_path / "cache.db")))
+    await storage.connect()
+    await storage.engine.dispose()
+    (tmp_path / "storage.db").unlink()
+
+    other = Storage(dsn, cache=ResultCache(str(tmp_path / "cache.db")))
+    await other.connect()
+    assert other.search_index
+    assert not (await other.list(search="core")).data
+    result = await other.query(datetime(2023, 7, 24), datetime(2023, 7, 28), no_sync=True)
+    assert not result.data
+
+
+def test_storage_cache_in_memory(tmp_path):
+    """results of in-memory database should never be shared with other processes"""
+    cache = ResultCache(str(tmp_path / "cache.db"))
+    assert Storage("sqlite+aiosqlite://", cache=cache).cache is None
+    assert Storage("sqlite+aiosqlite:///:memory:", cache=cache).cache is None
+    assert Storage(f"sqlite+aiosqlite:///{tmp_path / 'storage.db'}", cache=cache).cache is cache
@@ -1,4 +1,5 @@
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import pytest
@@ -109,3 +110,44 @@ async def test_data_provider_validation_fail(tradingview_sample_response: dict):
         assert not events
 
 
+@pytest.mark.asyncio()
+async def test_data_provider_response_validation_fail(tradingview_sample_response: dict):
+    """
+    Test if `fetch` method is returning False if response has no status
+    """
+    del tradingview_sample_response["status"]
+
+    provider = DataProvider()
+
+    date = datetime.today()
+    with aioresponses() as m:
+        pattern = re.compile(r"^https://economic-calendar\.tradingview\.com/events\?.*")
+        m.get(
+            pattern,
+            payload=tradingview_sample_response,
+            status=200,
+        )
+        events = await provider.fetch(date, date)
+        assert events is False
+
+
+@pytest.mark.asyncio()
+async def test_data_provider_executor(tradingview_sample_response: dict):
+    """
+    Test if events parsed in batches by executor keep the original order
+    """
+    provider = DataProvider()
+    provider.executor = ThreadPoolExecutor(2)
+    provider.batch_size = 2
+
+    date = datetime.today()
+    with aioresponses() as m:
+        pattern = re.compile(r"^https://economic-calendar\.tradingview\.com/events\?.*")
+        m.get(
+            pattern,
+            payload=tradingview_sample_response,
+            status=200,
+        )
+        events = await provider.fetch(date, date)
+        assert [event.ticker for event in events] == ["USMAPL", "USMRI", "AUCIR"]
+    provider.executor.shutdown()
@@ -0,0 +1,56 @@
+import json
+from datetime import datetime
+from typing import Dict
+
+import pytest
+
+from ecst import encoders
+from ecst.encoders import QUERY_COLUMNS, dump_result, dump_rows
+from ecst.schemas import ListResult, ListResultData, QueryResult, QueryResultData
+from ecst.storages import Storage
+
+rows = [
+    ("AUCIR", datetime(2023, 7, 26, 1, 30), 5.9, None),
+    ("USMAPL", datetime(2023, 7, 27), 1.0, 2.5),
+]
+
+
+@pytest.mark.parametrize("orjson", [encoders.orjson, None])
+def test_dump_result(monkeypatch, orjson):
+    """encoded results should be the same as pydantic ones with and without orjson"""
+    monkeypatch.setattr(encoders, "orjson", orjson)
+    result = QueryResult(
+        data=[QueryResultData(**dict(zip(QUERY_COLUMNS, row))) for row in rows], cursor="next"
+    )
+    assert dump_result(result).decode() == result.model_dump_json()
+    assert dump_rows(QUERY_COLUMNS, rows, cursor="next") == dump_result(result)
+
+    result = ListResult(
+        data=[
+            ListResultData(
+                country="AU",
+                currency="AUD",
+                indicator="Inflation Rate",
+                scale=None,
+                ticker="AUCIR",
+                title="Inflation Rate",
+                unit="%",
+            )
+        ]
+    )
+    assert dump_result(result).decode() == result.model_dump_json()
+
+
+def test_dump_rows_lines():
+    """rows should be encoded as JSON object per line"""
+    lines = dump_rows(QUERY_COLUMNS, rows, lines=True).decode().splitlines()
+    assert [json.loads(line)["ticker"] for line in lines] == ["AUCIR", "USMAPL"]
+
+
+@pytest.mark.asyncio()
+async def test_query_rows(storage: Storage, populate_db: Dict):
+    """query rows should hold the same values as query result"""
+    date_start, date_end = datetime(2023, 7, 26), datetime(2023, 7, 28)
+    result = await storage.query(date_start, date_end, no_sync=True)
+    rows, cursor = await storage.query_rows(date_start, date_end, no_sync=True)
+    assert dump_rows(QUERY_COLUMNS, rows, cursor=cursor) == dump_result(result)
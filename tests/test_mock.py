@@ -0,0 +1,79 @@
+from datetime import datetime
+
+import pytest
+from aiohttp.test_utils import TestServer
+
+from ecst.enums import Country, Workload
+from ecst.loadtest import load_test
+from ecst.mock import create_mock_app
+from ecst.storages import Storage
+
+
+@pytest.mark.asyncio()
+async def test_sync_with_mock_provider(dsn: str):
+    """storage should sync synthetic events from mock provider"""
+    async with TestServer(create_mock_app(size=20)) as server:
+        storage = Storage(dsn, provider_url=str(server.make_url("/")))
+        await storage.connect()
+        tickers = await storage.sync(datetime(2023, 7, 1), datetime(2023, 7, 8), ["US", "AU"])
+        assert sorted(tickers) == [f"{c}MOCK{n}" for c in ["AU", "US"] for n in range(10)]
+        results = await storage.query(datetime(2023, 7, 1), datetime(2023, 7, 8), no_sync=True)
+        assert len(results.data) == 20
+        # the same period has the same values
+        await storage.sync(datetime(2023, 7, 1), datetime(2023, 7, 8), ["US", "AU"])
+        assert storage.write_stats["unchanged"] == 20
+
+
+@pytest.mark.asyncio()
+async def test_mock_provider_errors(dsn: str):
+    """failed requests to provider should not be synced"""
+    async with TestServer(create_mock_app(error_rate=1)) as server:
+        storage = Storage(dsn, provider_url=str(server.make_url("/")))
+        await storage.connect()
+        assert await storage.fetch(datetime(2023, 7, 1), datetime(2023, 7, 8)) is False
+        assert await storage.dates_to_sync(
+            datetime(2023, 7, 1), datetime(2023, 7, 8), [Country.US]
+        ) == {(datetime(2023, 7, 1), datetime(2023, 7, 8)): [Country.US]}
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize("in_memory", [False, True])
+async def test_load_test(dsn: str, tmp_path, in_memory: bool):
+    """load test should report every workload, without errors of concurrent sessions"""
+    dsn = dsn if in_memory else f"sqlite+aiosqlite:///{tmp_path / 'load.db'}"
+    async with TestServer(create_mock_app(size=10)) as server:
+        storage = Storage(dsn, provider_url=str(server.make_url("/")))
+        await storage.connect()
+        result = await load_test(
+            storage,
+            [Workload.SYNC, Workload.QUERY],
+            datetime(2023, 1, 1),
+            datetime(2023, 3, 1),
+            concurrency=3,
+            requests=6,
+        )
+    assert [row.workload for row in result.data] == [Workload.SYNC, Workload.QUERY]
+    assert all(row.requests == 6 and not row.errors for row in result.data)
+    assert all(0 < row.p50 <= row.p90 <= row.p99 <= row.max for row in result.data)
+    assert [line.split(",")[0] for line in result.model_dump_csv().splitlines()[1:]] == [
+        "sync",
+        "query",
+    ]
+
+
+@pytest.mark.asyncio()
+async def test_load_test_errors(tmp_path):
+    """load test should count requests failed because of provider errors"""
+    dsn = f"sqlite+aiosqlite:///{tmp_path / 'load.db'}"
+    async with TestServer(create_mock_app(size=10, error_rate=1)) as server:
+        storage = Storage(dsn, provider_url=str(server.make_url("/")))
+        await storage.connect()
+        result = await load_test(
+            storage,
+            [Workload.SYNC, Workload.QUERY, Workload.LATEST],
+            datetime(2023, 1, 1),
+            datetime(2023, 3, 1),
+            concurrency=3,
+            requests=6,
+        )
+    assert [row.errors for row in result.data] == [6, 6, 0]
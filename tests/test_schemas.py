@@ -1,6 +1,8 @@
+import pickle
+import sys
 from datetime import datetime
 
-from ecst.schemas import Event
+from ecst.schemas import DataPoint, Event
 
 
 def test_fix_ticker():
@@ -28,3 +30,11 @@ def test_fix_period():
         period="Feb/2022",
     )
     assert event.period.value == "Feb"
+
+
+def test_data_point_pickle():
+    point = DataPoint(ticker="AUCIR", date=datetime(2023, 7, 26), actual=5.9, forecast=None)
+    restored = pickle.loads(pickle.dumps(point))
+    assert not hasattr(restored, "__dict__")
+    assert restored.to_model().actual == 5.9
+    assert restored.ticker is sys.intern("AUCIR")
@@ -0,0 +1,124 @@
+import asyncio
+import socket
+from datetime import datetime
+from typing import Dict
+
+import aiohttp
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from aioresponses import aioresponses
+
+from ecst.mock import create_mock_app
+from ecst.schemas import Settings
+from ecst.server import create_app, serve
+from ecst.storages import Storage
+
+
+@pytest.mark.asyncio()
+async def test_query(storage: Storage, populate_db: Dict):
+    """query endpoint should return data for given period"""
+    async with TestClient(TestServer(create_app(storage))) as client:
+        resp = await client.get(
+            "/query",
+            params={"date_start": "2023-07-26", "days": 1, "tickers": "AUCIR", "no_sync": "1"},
+        )
+        assert resp.status == 200
+        result = await resp.json()
+        assert [row["actual"] for row in result["data"]] == [5.9, 6.6]
+
+
+@pytest.mark.asyncio()
+async def test_query_pages(storage: Storage, populate_db: Dict):
+    """query endpoint should return limited pages with cursor of the next one"""
+    params = {"date_start": "2023-07-26", "days": 1, "no_sync": "1", "limit": 2}
+    async with TestClient(TestServer(create_app(storage))) as client:
+        resp = await client.get("/query", params=params)
+        first = await resp.json()
+        resp = await client.get("/query", params={**params, "cursor": first["cursor"]})
+        second = await resp.json()
+        assert [len(first["data"]), len(second["data"])] == [2, 1]
+        assert second["cursor"] is None
+
+        resp = await client.get("/query", params={**params, "cursor": "invalid"})
+        assert resp.status == 400
+
+
+@pytest.mark.asyncio()
+async def test_query_json_lines(storage: Storage, populate_db: Dict):
+    """query endpoint should return JSON Lines with cursor in header"""
+    params = {"date_start": "2023-07-26", "days": 1, "no_sync": "1", "limit": 2, "format": "jsonl"}
+    async with TestClient(TestServer(create_app(storage))) as client:
+        resp = await client.get("/query", params=params)
+        assert resp.content_type == "application/x-ndjson"
+        assert len((await resp.text()).splitlines()) == 2
+        assert resp.headers["X-Cursor"]
+
+
+@pytest.mark.asyncio()
+async def test_list(storage: Storage, populate_db: Dict):
+    """list endpoint should filter indicators by countries"""
+    async with TestClient(TestServer(create_app(storage))) as client:
+        resp = await client.get("/list", params={"countries": "US"})
+        assert resp.status == 200
+        result = await resp.json()
+        assert [row["ticker"] for row in result["data"]] == ["USMAPL"]
+
+        resp = await client.get("/list", params={"countries": "XX"})
+        assert resp.status == 400
+
+
+@pytest.mark.asyncio()
+async def test_query_read_only(storage: Storage, populate_db: Dict):
+    """read only server should never sync data with provider"""
+    with aioresponses(passthrough=["http://127.0.0.1"]) as m:
+        async with TestClient(TestServer(create_app(storage, read_only=True))) as client:
+            resp = await client.get("/query", params={"date_start": "2023-07-26"})
+            assert resp.status == 200
+            assert len((await resp.json())["data"]) == 3
+        assert not m.requests
+
+
+@pytest.mark.asyncio()
+async def test_serve_workers(tmp_path, monkeypatch):
+    """workers should route syncs to the single writer, and stream changes it writes"""
+    # syncs are recorded only in the current process, that is the writer
+    synced = []
+    sync_once = Storage.sync_once
+
+    async def record_sync(storage, *args, **kwargs):
+        synced.append(args[:2])
+        return await sync_once(storage, *args, **kwargs)
+
+    monkeypatch.setattr(Storage, "sync_once", record_sync)
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    url = f"http://127.0.0.1:{port}"
+    async with TestServer(create_mock_app(size=10)) as provider:
+        settings = Settings(
+            storage=f"sqlite+aiosqlite:///{tmp_path / 'storage.db'}",
+            provider_url=str(provider.make_url("/")),
+            port=port,
+            workers=2,
+        )
+        server = asyncio.create_task(serve(settings))
+        try:
+            async with aiohttp.ClientSession() as session:
+                # workers start listening once they are subscribed to changes of the writer
+                for _ in range(100):
+                    try:
+                        watch = await session.get(f"{url}/watch", params={"countries": "US"})
+                        break
+                    except aiohttp.ClientConnectionError:
+                        await asyncio.sleep(0.2)
+                params = {"date_start": "2023-07-01", "date_end": "2023-07-08", "countries": "US"}
+                async with session.get(f"{url}/query", params=params) as resp:
+                    assert resp.status == 200
+                    assert len((await resp.json())["data"]) == 10
+                assert (datetime(2023, 7, 1), datetime(2023, 7, 8)) in synced
+                line = await asyncio.wait_for(watch.content.readline(), 10)
+                assert line.startswith(b"data: ")
+                watch.close()
+        finally:
+            server.cancel()
+            await asyncio.gather(server, return_exceptions=True)
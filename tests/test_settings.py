@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 from datetime import datetime
 from typing import Dict
 
@@ -45,3 +48,20 @@ def test_parse_days(
         schema = Settings(storage=dsn, days=days, **inputs)
         assert schema.date_start == expected["date_start"]
         assert schema.date_end == expected["date_end"]
+
+
+def test_parse_retention(dsn: str):
+    schema = Settings(storage=dsn, retention="US=365,AUCIR=30")
+    assert schema.retention == {"US": 365, "AUCIR": 30}
+
+
+def test_environment_defaults():
+    """values of environment variables should be validated as CLI arguments"""
+    # defaults are read from environment when settings are imported
+    code = "from ecst.schemas import Settings; print(repr(Settings().cache_size))"
+    env = {**os.environ, "ECST_CACHE_SIZE": "1000000"}
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=env, cwd=root, capture_output=True, text=True
+    )
+    assert result.stdout.strip() == "1000000"